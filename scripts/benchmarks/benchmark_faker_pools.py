@@ -0,0 +1,67 @@
+import sys
+import time
+from pathlib import Path
+
+# ----------------------------------------------------
+# FIX PYTHON IMPORT PATH
+# ----------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import scripts.data_generation.generate_data as gen
+
+# ----------------------------------------------------
+# Benchmark Settings
+# ----------------------------------------------------
+ROWS = 20000
+POOL_SIZE = gen.config["data_generation"].get("faker_pool_size") or 5000
+
+
+def rows_per_second(fn, rows):
+    start = time.perf_counter()
+    fn()
+    return rows / (time.perf_counter() - start)
+
+
+def run_benchmark(rows: int = ROWS, pool_size: int = POOL_SIZE) -> dict:
+    """
+    Time the per-row Faker generators against the pooled ones.
+    Pool construction is timed separately since it is paid once per run.
+    """
+    gen.random.seed(0)
+    gen.fake.seed_instance(0)
+
+    pool_start = time.perf_counter()
+    pools = gen.build_faker_pools(pool_size, seed=0)
+    pool_build_seconds = time.perf_counter() - pool_start
+
+    customers = gen.generate_customers(1000, pools=pools)
+
+    cases = {
+        "customers": lambda p: gen.generate_customers(rows, pools=p),
+        "products": lambda p: gen.generate_products(rows, pools=p),
+        "transactions": lambda p: gen.generate_transactions(rows, customers, pools=p),
+    }
+
+    results = {"rows": rows, "pool_size": pool_size,
+               "pool_build_seconds": round(pool_build_seconds, 2), "tables": {}}
+    for table, build in cases.items():
+        before = rows_per_second(lambda: build(None), rows)
+        after = rows_per_second(lambda: build(pools), rows)
+        results["tables"][table] = {
+            "per_row_faker_rows_per_sec": round(before),
+            "pooled_rows_per_sec": round(after),
+            "speedup": round(after / before, 1)
+        }
+    return results
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    print(f"Rows per table: {results['rows']}  |  pool size: {results['pool_size']}  "
+          f"|  pool build: {results['pool_build_seconds']}s")
+    print(f"{'table':<14}{'per-row rows/s':>16}{'pooled rows/s':>16}{'speedup':>10}")
+    for table, r in results["tables"].items():
+        print(f"{table:<14}{r['per_row_faker_rows_per_sec']:>16}"
+              f"{r['pooled_rows_per_sec']:>16}{r['speedup']:>9}x")
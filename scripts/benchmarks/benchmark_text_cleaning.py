@@ -0,0 +1,84 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------------
+# FIX PYTHON IMPORT PATH
+# ----------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import scripts.data_generation.generate_data as gen
+from scripts.transformation.text_normalization import CUSTOMER_TEXT_RULES, normalize_text
+
+# ----------------------------------------------------
+# Benchmark Settings
+# ----------------------------------------------------
+ROWS = 1_000_000
+SAMPLE_ROWS = 5000
+
+
+# ----------------------------------------------------
+# Baseline: object-dtype cleaning used before the Arrow engine
+# ----------------------------------------------------
+def legacy_clean_text(df):
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].astype(str).str.strip()
+    return df
+
+
+def legacy_standardize_customers(df):
+    df = legacy_clean_text(df)
+    df["email"] = df["email"].str.lower()
+    df["first_name"] = df["first_name"].str.title()
+    df["last_name"] = df["last_name"].str.title()
+    df["phone"] = df["phone"].str.replace(r"\D", "", regex=True)
+    return df
+
+
+def build_customer_frame(rows: int) -> pd.DataFrame:
+    """Tile a generated sample to `rows` rows, padding text with whitespace."""
+    sample = gen.generate_customers(SAMPLE_ROWS, pools=gen.build_faker_pools(1000, seed=0))
+    df = sample.iloc[np.arange(rows) % SAMPLE_ROWS].reset_index(drop=True)
+    for col in ["first_name", "last_name", "email", "city"]:
+        df[col] = " " + df[col] + " "
+    return df
+
+
+def seconds(fn, df):
+    frame = df.copy()
+    start = time.perf_counter()
+    fn(frame)
+    return time.perf_counter() - start
+
+
+def run_benchmark(rows: int = ROWS) -> dict:
+    df = build_customer_frame(rows)
+
+    legacy = legacy_standardize_customers(df.copy())
+    arrow = normalize_text(df.copy(), CUSTOMER_TEXT_RULES)
+    text_columns = ["first_name", "last_name", "email", "phone", "city", "state"]
+    matches = bool((legacy[text_columns] == arrow[text_columns].astype(object)).all().all())
+
+    before = seconds(legacy_standardize_customers, df)
+    after = seconds(lambda frame: normalize_text(frame, CUSTOMER_TEXT_RULES), df)
+    return {
+        "rows": rows,
+        "legacy_seconds": round(before, 2),
+        "arrow_seconds": round(after, 2),
+        "speedup": round(before / after, 1),
+        "outputs_match": matches
+    }
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    print(f"Customer rows: {results['rows']}  |  outputs match: {results['outputs_match']}")
+    print(f"{'engine':<22}{'seconds':>10}")
+    print(f"{'object dtype (legacy)':<22}{results['legacy_seconds']:>10}")
+    print(f"{'string[pyarrow]':<22}{results['arrow_seconds']:>10}")
+    print(f"speedup: {results['speedup']}x")
@@ -1,11 +1,23 @@
 import pandas as pd
+import numpy as np
 import random
 import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
 from datetime import datetime
 import yaml
 from pathlib import Path
 
+# Allow `python scripts/data_generation/generate_data.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.storage_formats import RAW_TABLES, TableWriter, raw_file_name, write_table
+
 fake = Faker()
 
 # -----------------------------
@@ -17,14 +29,131 @@ with open("config/config.yaml", "r") as f:
 DATA_DIR = Path("data/raw")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+RAW_FORMAT = config.get("storage", {}).get("raw_format", "csv")
+
+AGE_GROUPS = ["18-25", "26-35", "36-45", "46-60", "60+"]
+
+CATEGORIES = {
+    "Electronics": ["Mobile", "Laptop", "Headphones"],
+    "Clothing": ["Shirt", "Jeans", "Dress"],
+    "Home & Kitchen": ["Furniture", "Cookware"],
+    "Books": ["Fiction", "Education"],
+    "Sports": ["Fitness", "Outdoor"],
+    "Beauty": ["Skincare", "Makeup"]
+}
+
+PAYMENT_METHODS = [
+    "Credit Card", "Debit Card", "UPI",
+    "Cash on Delivery", "Net Banking"
+]
+
+# -----------------------------
+# Faker value pools
+# -----------------------------
+# Provider name -> callable producing one value. Pools hold up to
+# faker_pool_size distinct values per provider; providers with a small
+# domain (e.g. state) simply yield shorter pools.
+POOL_PROVIDERS = {
+    "first_name": lambda f: f.first_name(),
+    "last_name": lambda f: f.last_name(),
+    "msisdn": lambda f: f.msisdn(),
+    "city": lambda f: f.city(),
+    "state": lambda f: f.state(),
+    "word": lambda f: f.word().title(),
+    "company": lambda f: f.company(),
+    "address": lambda f: f.address().replace("\n", ", ")
+}
+
+_faker_pools = None
+
+
+def build_faker_pools(pool_size: int, seed=None) -> dict:
+    """Draw up to pool_size distinct values from every pooled provider once."""
+    pool_faker = Faker()
+    pool_faker.seed_instance(seed)
+
+    pools = {}
+    for name, provider in POOL_PROVIDERS.items():
+        # Insertion-ordered de-duplication keeps the pool reproducible
+        values = dict.fromkeys(provider(pool_faker) for _ in range(pool_size))
+        pools[name] = list(values)
+    return pools
+
+
+def get_faker_pools():
+    """
+    Return the process-wide pools, or None when faker_pool_size is 0.
+    Pools are loaded from faker_pool_cache when it was built with the same
+    seed and size, otherwise drawn once and saved there.
+    """
+    global _faker_pools
+
+    gen_config = config["data_generation"]
+    pool_size = gen_config.get("faker_pool_size", 0)
+    if not pool_size:
+        return None
+    if _faker_pools is not None:
+        return _faker_pools
+
+    seed = gen_config.get("seed")
+    cache_path = gen_config.get("faker_pool_cache")
+    cache_key = {"seed": seed, "pool_size": pool_size, "providers": sorted(POOL_PROVIDERS)}
+
+    if cache_path and Path(cache_path).exists():
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("key") == cache_key:
+            _faker_pools = cached["pools"]
+
+    if _faker_pools is None:
+        _faker_pools = build_faker_pools(pool_size, seed)
+        if cache_path and seed is not None:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump({"key": cache_key, "pools": _faker_pools}, f)
+
+    return _faker_pools
+
+
+def _pool_rng():
+    # Drawn from `random` so the module/shard seeding also fixes pool picks
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def _sample_pool(rng, pools: dict, name: str, size: int) -> np.ndarray:
+    pool = np.asarray(pools[name], dtype=object)
+    return pool[rng.integers(0, len(pool), size=size)]
+
+
 # -----------------------------
 # Customers
 # -----------------------------
-def generate_customers(num_customers: int) -> pd.DataFrame:
-    age_groups = ["18-25", "26-35", "36-45", "46-60", "60+"]
+def _generate_customers_from_pools(num_customers: int, start: int, pools: dict) -> pd.DataFrame:
+    rng = _pool_rng()
+    numbers = pd.Series(np.arange(start, start + num_customers)).astype(str)
+    today = pd.Timestamp.today().normalize()
+    days_back = rng.integers(0, 2 * 365 + 1, size=num_customers)
+
+    return pd.DataFrame({
+        "customer_id": _format_ids("CUST", start, num_customers, 4),
+        "first_name": _sample_pool(rng, pools, "first_name", num_customers),
+        "last_name": _sample_pool(rng, pools, "last_name", num_customers),
+        "email": "customer" + numbers + "@example.com",
+        "phone": _sample_pool(rng, pools, "msisdn", num_customers),
+        "registration_date": (today - pd.to_timedelta(days_back, unit="D")).date,
+        "city": _sample_pool(rng, pools, "city", num_customers),
+        "state": _sample_pool(rng, pools, "state", num_customers),
+        "country": "India",
+        "age_group": rng.choice(AGE_GROUPS, size=num_customers)
+    })
+
+
+def generate_customers(num_customers: int, start: int = 1, pools=None) -> pd.DataFrame:
+    if pools:
+        return _generate_customers_from_pools(num_customers, start, pools)
 
     customers = []
-    for i in range(1, num_customers + 1):
+    for i in range(start, start + num_customers):
         customers.append({
             "customer_id": f"CUST{i:04d}",
             "first_name": fake.first_name(),
@@ -35,7 +164,7 @@ def generate_customers(num_customers: int) -> pd.DataFrame:
             "city": fake.city(),
             "state": fake.state(),
             "country": "India",
-            "age_group": random.choice(age_groups)
+            "age_group": random.choice(AGE_GROUPS)
         })
 
     return pd.DataFrame(customers)
@@ -43,20 +172,41 @@ def generate_customers(num_customers: int) -> pd.DataFrame:
 # -----------------------------
 # Products
 # -----------------------------
-def generate_products(num_products: int) -> pd.DataFrame:
-    categories = {
-        "Electronics": ["Mobile", "Laptop", "Headphones"],
-        "Clothing": ["Shirt", "Jeans", "Dress"],
-        "Home & Kitchen": ["Furniture", "Cookware"],
-        "Books": ["Fiction", "Education"],
-        "Sports": ["Fitness", "Outdoor"],
-        "Beauty": ["Skincare", "Makeup"]
-    }
+def _generate_products_from_pools(num_products: int, start: int, pools: dict) -> pd.DataFrame:
+    rng = _pool_rng()
+    category_names = np.array(list(CATEGORIES), dtype=object)
+    category_pos = rng.integers(0, len(category_names), size=num_products)
+
+    sub_categories = np.empty(num_products, dtype=object)
+    for pos, category in enumerate(category_names):
+        mask = category_pos == pos
+        sub_categories[mask] = rng.choice(CATEGORIES[category], size=int(mask.sum()))
+
+    price = np.round(rng.uniform(200, 5000, size=num_products), 2)
+    cost = np.round(price * rng.uniform(0.6, 0.85, size=num_products), 2)
+    supplier_numbers = pd.Series(rng.integers(1, 51, size=num_products)).astype(str)
+
+    return pd.DataFrame({
+        "product_id": _format_ids("PROD", start, num_products, 4),
+        "product_name": _sample_pool(rng, pools, "word", num_products) + " " + sub_categories,
+        "category": category_names[category_pos],
+        "sub_category": sub_categories,
+        "price": price,
+        "cost": cost,
+        "brand": _sample_pool(rng, pools, "company", num_products),
+        "stock_quantity": rng.integers(10, 501, size=num_products),
+        "supplier_id": "SUP" + supplier_numbers.str.zfill(3)
+    })
+
+
+def generate_products(num_products: int, start: int = 1, pools=None) -> pd.DataFrame:
+    if pools:
+        return _generate_products_from_pools(num_products, start, pools)
 
     products = []
-    for i in range(1, num_products + 1):
-        category = random.choice(list(categories.keys()))
-        sub_category = random.choice(categories[category])
+    for i in range(start, start + num_products):
+        category = random.choice(list(CATEGORIES.keys()))
+        sub_category = random.choice(CATEGORIES[category])
 
         price = round(random.uniform(200, 5000), 2)
         cost = round(price * random.uniform(0.6, 0.85), 2)
@@ -78,23 +228,52 @@ def generate_products(num_products: int) -> pd.DataFrame:
 # -----------------------------
 # Transactions
 # -----------------------------
-def generate_transactions(num_transactions: int, customers_df: pd.DataFrame) -> pd.DataFrame:
-    payment_methods = [
-        "Credit Card", "Debit Card", "UPI",
-        "Cash on Delivery", "Net Banking"
-    ]
+def _transaction_date_range():
+    date_range = config["data_generation"]["transaction_date_range"]
+    return (
+        datetime.strptime(date_range["start_date"], "%Y-%m-%d"),
+        datetime.strptime(date_range["end_date"], "%Y-%m-%d")
+    )
 
-    customer_ids = customers_df["customer_id"].tolist()
 
-    start_date = datetime.strptime(
-        config["data_generation"]["transaction_date_range"]["start_date"], "%Y-%m-%d"
-    )
-    end_date = datetime.strptime(
-        config["data_generation"]["transaction_date_range"]["end_date"], "%Y-%m-%d"
+def _generate_transactions_from_pools(
+    num_transactions: int,
+    customers_df: pd.DataFrame,
+    start: int,
+    pools: dict
+) -> pd.DataFrame:
+    rng = _pool_rng()
+    start_date, end_date = _transaction_date_range()
+    span_seconds = int((end_date - start_date).total_seconds())
+    tx_times = pd.Timestamp(start_date) + pd.to_timedelta(
+        rng.integers(0, span_seconds, size=num_transactions), unit="s"
     )
 
+    return pd.DataFrame({
+        "transaction_id": _format_ids("TXN", start, num_transactions, 5),
+        "customer_id": rng.choice(customers_df["customer_id"].to_numpy(), size=num_transactions),
+        "transaction_date": tx_times.normalize(),
+        "transaction_time": tx_times.strftime("%H:%M:%S"),
+        "payment_method": rng.choice(PAYMENT_METHODS, size=num_transactions),
+        "shipping_address": _sample_pool(rng, pools, "address", num_transactions),
+        "total_amount": 0.0
+    })
+
+
+def generate_transactions(
+    num_transactions: int,
+    customers_df: pd.DataFrame,
+    start: int = 1,
+    pools=None
+) -> pd.DataFrame:
+    if pools:
+        return _generate_transactions_from_pools(num_transactions, customers_df, start, pools)
+
+    customer_ids = customers_df["customer_id"].tolist()
+    start_date, end_date = _transaction_date_range()
+
     transactions = []
-    for i in range(1, num_transactions + 1):
+    for i in range(start, start + num_transactions):
         tx_time = fake.date_time_between(start_date=start_date, end_date=end_date)
 
         transactions.append({
@@ -102,7 +281,7 @@ def generate_transactions(num_transactions: int, customers_df: pd.DataFrame) ->
             "customer_id": random.choice(customer_ids),
             "transaction_date": tx_time.date(),
             "transaction_time": tx_time.time(),
-            "payment_method": random.choice(payment_methods),
+            "payment_method": random.choice(PAYMENT_METHODS),
             "shipping_address": fake.address().replace("\n", ", "),
             "total_amount": 0.0
         })
@@ -112,46 +291,295 @@ def generate_transactions(num_transactions: int, customers_df: pd.DataFrame) ->
 # -----------------------------
 # Transaction Items
 # -----------------------------
+MAX_ITEMS_PER_TRANSACTION = 5
+QUANTITY_RANGE = (1, 3)
+DISCOUNT_CHOICES = np.array([0, 5, 10, 15])
+
+
+def _format_ids(prefix: str, start: int, count: int, width: int) -> pd.Series:
+    """Vectorized equivalent of f"{prefix}{i:0{width}d}" for a contiguous range."""
+    numbers = pd.Series(np.arange(start, start + count), dtype="int64")
+    return prefix + numbers.astype(str).str.zfill(width)
+
+
+def _pick_distinct_products(rng, num_rows: int, picks: int, num_products: int) -> np.ndarray:
+    """
+    Draw `picks` distinct product positions per row.
+    Rows that drew a duplicate are redrawn until every row is clean, which
+    converges in a couple of rounds because collisions are rare.
+    """
+    chosen = rng.integers(0, num_products, size=(num_rows, picks))
+    while True:
+        ordered = np.sort(chosen, axis=1)
+        dupes = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        if not dupes.any():
+            return chosen
+        chosen[dupes] = rng.integers(0, num_products, size=(int(dupes.sum()), picks))
+
+
 def generate_transaction_items(
     transactions_df: pd.DataFrame,
-    products_df: pd.DataFrame
+    products_df: pd.DataFrame,
+    seed=None,
+    item_start: int = 1
 ) -> pd.DataFrame:
+    """
+    Columnar item generator.
+    Item counts, product picks, quantities, discounts and line totals are
+    built as NumPy arrays; transaction totals come from a single bincount
+    and are written back to transactions_df["total_amount"].
+    `seed` may be an int or an existing np.random.Generator.
+    """
+    rng = np.random.default_rng(seed)
+
+    num_txns = len(transactions_df)
+    product_ids = products_df["product_id"].to_numpy()
+    prices = products_df["price"].to_numpy(dtype=float)
+    max_items = min(MAX_ITEMS_PER_TRANSACTION, len(product_ids))
 
-    items = []
-    product_lookup = products_df.set_index("product_id").to_dict("index")
-    item_counter = 1
+    item_counts = rng.integers(1, max_items + 1, size=num_txns)
+    picks = _pick_distinct_products(rng, num_txns, max_items, len(product_ids))
 
-    for _, txn in transactions_df.iterrows():
-        num_items = random.randint(1, 5)
-        chosen_products = random.sample(list(product_lookup.keys()), num_items)
-        txn_total = 0.0
+    # Keep the first item_counts[i] picks of every row (row-major = txn order)
+    keep = np.arange(max_items) < item_counts[:, None]
+    product_pos = picks[keep]
+    txn_pos = np.repeat(np.arange(num_txns), item_counts)
+    num_items = len(product_pos)
 
-        for pid in chosen_products:
-            quantity = random.randint(1, 3)
-            unit_price = product_lookup[pid]["price"]
-            discount = random.choice([0, 5, 10, 15])
+    quantities = rng.integers(QUANTITY_RANGE[0], QUANTITY_RANGE[1] + 1, size=num_items)
+    discounts = rng.choice(DISCOUNT_CHOICES, size=num_items)
+    unit_prices = prices[product_pos]
+    line_totals = np.round(quantities * unit_prices * (1 - discounts / 100), 2)
 
-            line_total = round(quantity * unit_price * (1 - discount / 100), 2)
-            txn_total += line_total
+    txn_totals = np.bincount(txn_pos, weights=line_totals, minlength=num_txns)
+    transactions_df["total_amount"] = np.round(txn_totals, 2)
 
-            items.append({
-                "item_id": f"ITEM{item_counter:05d}",
-                "transaction_id": txn["transaction_id"],
-                "product_id": pid,
-                "quantity": quantity,
-                "unit_price": unit_price,
-                "discount_percentage": discount,
-                "line_total": line_total
-            })
+    return pd.DataFrame({
+        "item_id": _format_ids("ITEM", item_start, num_items, 5),
+        "transaction_id": transactions_df["transaction_id"].to_numpy()[txn_pos],
+        "product_id": product_ids[product_pos],
+        "quantity": quantities,
+        "unit_price": unit_prices,
+        "discount_percentage": discounts,
+        "line_total": line_totals
+    })
+
+# -----------------------------
+# Streaming (chunked) generation
+# -----------------------------
+TABLE_SEED_CODES = {
+    "customers": 1,
+    "products": 2,
+    "transactions": 3
+}
 
-            item_counter += 1
 
-        transactions_df.loc[
-            transactions_df["transaction_id"] == txn["transaction_id"],
-            "total_amount"
-        ] = round(txn_total, 2)
+def _chunk_seed(seed, table: str, chunk_index: int):
+    """Derive an independent, reproducible seed for one chunk of one table."""
+    if seed is None:
+        return None
+    sequence = np.random.SeedSequence([seed, TABLE_SEED_CODES[table], chunk_index])
+    return int(sequence.generate_state(1)[0])
+
+
+def _chunk_ranges(total: int, chunk_size: int):
+    """Yield (chunk_index, start_id, row_count) covering IDs 1..total."""
+    for chunk_index, offset in enumerate(range(0, total, chunk_size)):
+        yield chunk_index, offset + 1, min(chunk_size, total - offset)
+
+
+def _seed_chunk(chunk_seed):
+    random.seed(chunk_seed)
+    fake.seed_instance(chunk_seed)
+
+
+# -----------------------------
+# Shard builders
+# -----------------------------
+# Each builder is a top-level function taking one picklable task tuple so it
+# can run in the parent process or in a ProcessPoolExecutor worker. All
+# randomness comes from the shard's derived seed, which is why the output
+# does not depend on how many workers produced it.
+_worker_product_prices = None
+
+
+def _init_shard_worker(product_prices: pd.DataFrame):
+    global _worker_product_prices
+    _worker_product_prices = product_prices
+
+
+def _build_customer_shard(task) -> pd.DataFrame:
+    seed, chunk_index, start, count = task
+    _seed_chunk(_chunk_seed(seed, "customers", chunk_index))
+    return generate_customers(count, start=start, pools=get_faker_pools())
+
+
+def _build_product_shard(task) -> pd.DataFrame:
+    seed, chunk_index, start, count = task
+    _seed_chunk(_chunk_seed(seed, "products", chunk_index))
+    return generate_products(count, start=start, pools=get_faker_pools())
+
+
+def _build_transaction_shard(task):
+    """
+    Returns (transactions, items). Item IDs are numbered from 1 inside the
+    shard; the parent renumbers them once it knows the shard's offset.
+    """
+    seed, chunk_index, start, count, num_customers = task
+    chunk_seed = _chunk_seed(seed, "transactions", chunk_index)
+    _seed_chunk(chunk_seed)
+
+    # Transactions only need the customer ID domain, not the customer rows
+    customer_ids = pd.DataFrame({
+        "customer_id": _format_ids("CUST", 1, num_customers, 4)
+    })
+    transactions = generate_transactions(
+        count, customer_ids, start=start, pools=get_faker_pools()
+    )
+    items = generate_transaction_items(
+        transactions, _worker_product_prices, seed=chunk_seed
+    )
+    return transactions, items
+
+
+def _shard_tasks(seed, total: int, chunk_size: int, *extra):
+    return [
+        (seed, chunk_index, start, count, *extra)
+        for chunk_index, start, count in _chunk_ranges(total, chunk_size)
+    ]
+
+
+def _bounded_map(executor, fn, tasks, window: int):
+    """
+    Like executor.map, but with at most `window` shards submitted at a
+    time, so finished chunks waiting to be written cannot pile up in
+    memory. Results are yielded in task order as soon as each is ready.
+    """
+    tasks = iter(tasks)
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= window:
+            break
+
+    while pending:
+        result = pending.popleft().result()
+        next_task = next(tasks, None)
+        if next_task is not None:
+            pending.append(executor.submit(fn, next_task))
+        yield result
+
+
+def generate_all_data_streaming(chunk_size: int, workers: int = 1) -> dict:
+    """
+    Generate every table in fixed-size chunks and append each chunk to its
+    raw file as soon as it is built. Only the product price list (needed to
+    price items) outlives a chunk, so peak memory depends on chunk_size
+    and the product count, not on the number of transactions.
+
+    With workers > 1 the chunks are built by a process pool, about two
+    per worker in flight, and merged in ID order, producing the same
+    files as a single-process run.
+    """
+    gen_config = config["data_generation"]
+    seed = gen_config.get("seed")
+    num_customers = gen_config["customers"]
+
+    customer_tasks = _shard_tasks(seed, num_customers, chunk_size)
+    product_tasks = _shard_tasks(seed, gen_config["products"], chunk_size)
+    transaction_tasks = _shard_tasks(
+        seed, gen_config["transactions"], chunk_size, num_customers
+    )
+
+    # Build (or load) the pools before any worker starts so they are drawn
+    # and cached exactly once; forked workers inherit them.
+    get_faker_pools()
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+        def run_shards(fn, tasks):
+            return _bounded_map(executor, fn, tasks, window=2 * workers)
+    else:
+        executor = None
+        run_shards = map
+
+    writers = {
+        table: TableWriter(DATA_DIR / raw_file_name(table, RAW_FORMAT), table, RAW_FORMAT)
+        for table in RAW_TABLES
+    }
+
+    try:
+        for customers_chunk in run_shards(_build_customer_shard, customer_tasks):
+            writers["customers"].write(customers_chunk)
+
+        product_chunks = []
+        for products_chunk in run_shards(_build_product_shard, product_tasks):
+            writers["products"].write(products_chunk)
+            product_chunks.append(products_chunk[["product_id", "price"]])
+        # No product chunks at all when the catalogue is empty
+        product_prices = (
+            pd.concat(product_chunks, ignore_index=True)
+            if product_chunks
+            else pd.DataFrame(columns=["product_id", "price"])
+        )
+
+        if executor is not None:
+            # Workers receive the price list once instead of once per task
+            executor.shutdown()
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_shard_worker,
+                initargs=(product_prices,)
+            )
+        else:
+            _init_shard_worker(product_prices)
+
+        item_start = 1
+        for transactions_chunk, items_chunk in run_shards(
+            _build_transaction_shard, transaction_tasks
+        ):
+            items_chunk["item_id"] = _format_ids(
+                "ITEM", item_start, len(items_chunk), 5
+            ).to_numpy()
+
+            writers["transactions"].write(transactions_chunk)
+            writers["transaction_items"].write(items_chunk)
+            item_start += len(items_chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "customers": num_customers,
+        "products": len(product_prices),
+        "transactions": gen_config["transactions"],
+        "transaction_items": item_start - 1
+    }
+
+
+def _resolve_workers(gen_config: dict) -> int:
+    return gen_config.get("workers") or os.cpu_count() or 1
+
+
+def write_generation_metadata(stats: dict, mode: str):
+    gen_config = config["data_generation"]
+    metadata = {
+        "generated_at": datetime.now().isoformat(),
+        "generation_mode": mode,
+        "seed": gen_config.get("seed"),
+        "chunk_size": gen_config.get("chunk_size") if mode != "batch" else None,
+        "workers": _resolve_workers(gen_config) if mode == "parallel" else 1,
+        "raw_format": RAW_FORMAT,
+        "record_counts": stats,
+        "transaction_date_range": gen_config["transaction_date_range"]
+    }
+
+    with open(DATA_DIR / "generation_metadata.json", "w") as f:
+        json.dump(metadata, f, indent=4)
 
-    return pd.DataFrame(items)
 
 # --------------------------------------------------
 # MASTER FUNCTION FOR PIPELINE ORCHESTRATOR (REQUIRED)
@@ -159,26 +587,48 @@ def generate_transaction_items(
 def generate_all_data():
     """
     Called by pipeline_orchestrator.py
-    Generates ALL raw CSV files
+    Generates ALL raw files in the configured storage format
     """
-    customers_df = generate_customers(config["data_generation"]["customers"])
-    products_df = generate_products(config["data_generation"]["products"])
+    gen_config = config["data_generation"]
+    mode = gen_config.get("mode", "batch")
+
+    if mode in ("streaming", "parallel"):
+        workers = _resolve_workers(gen_config) if mode == "parallel" else 1
+        stats = generate_all_data_streaming(
+            gen_config.get("chunk_size", 100000), workers=workers
+        )
+        write_generation_metadata(stats, mode)
+        return stats
+
+    seed = gen_config.get("seed")
+    random.seed(seed)
+    fake.seed_instance(seed)
+
+    pools = get_faker_pools()
+    customers_df = generate_customers(gen_config["customers"], pools=pools)
+    products_df = generate_products(gen_config["products"], pools=pools)
     transactions_df = generate_transactions(
-        config["data_generation"]["transactions"], customers_df
+        gen_config["transactions"], customers_df, pools=pools
     )
-    items_df = generate_transaction_items(transactions_df, products_df)
+    items_df = generate_transaction_items(transactions_df, products_df, seed=seed)
 
-    customers_df.to_csv(DATA_DIR / "customers.csv", index=False)
-    products_df.to_csv(DATA_DIR / "products.csv", index=False)
-    transactions_df.to_csv(DATA_DIR / "transactions.csv", index=False)
-    items_df.to_csv(DATA_DIR / "transaction_items.csv", index=False)
+    frames = {
+        "customers": customers_df,
+        "products": products_df,
+        "transactions": transactions_df,
+        "transaction_items": items_df
+    }
+    for table, df in frames.items():
+        write_table(df, DATA_DIR / raw_file_name(table, RAW_FORMAT), table, RAW_FORMAT)
 
-    return {
+    stats = {
         "customers": len(customers_df),
         "products": len(products_df),
         "transactions": len(transactions_df),
         "transaction_items": len(items_df)
     }
+    write_generation_metadata(stats, mode)
+    return stats
 
 # -----------------------------
 # Standalone Execution
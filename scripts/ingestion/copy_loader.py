@@ -0,0 +1,59 @@
+import csv
+import io
+from pathlib import Path
+
+
+# -----------------------------
+# COPY Helpers
+# -----------------------------
+def _quote_columns(columns):
+    return ", ".join('"' + c.replace('"', '""') + '"' for c in columns)
+
+
+def copy_csv_stream(connection, table_name: str, stream) -> int:
+    """
+    COPY a headered CSV text stream into `table_name` via COPY FROM STDIN.
+    Runs on the raw psycopg2 connection behind the SQLAlchemy
+    `connection`, so it joins that connection's open transaction.
+    Returns the number of rows COPY reported.
+    """
+    columns = next(csv.reader([stream.readline()]))
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({_quote_columns(columns)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            stream
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def copy_csv_to_table(connection, table_name: str, file_path: Path) -> int:
+    """Stream a headered CSV file into `table_name` with COPY FROM STDIN."""
+    with open(file_path, "r", newline="", encoding="utf-8") as f:
+        return copy_csv_stream(connection, table_name, f)
+
+
+def copy_dataframe_to_table(connection, df, table_name: str) -> int:
+    """
+    COPY a DataFrame into `table_name` (columns matched by name) through an
+    in-memory CSV buffer. NaN/None are written as empty fields, which COPY
+    reads as NULL.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({_quote_columns(df.columns)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
@@ -0,0 +1,106 @@
+import json
+import hashlib
+from pathlib import Path
+
+from sqlalchemy import text
+
+
+# -----------------------------
+# Paths
+# -----------------------------
+# Kept next to ingestion_summary.json so cleanup_old_data.py never removes it
+CACHE_FILE = Path("data/staging/raw_fingerprints.json")
+
+
+# -----------------------------
+# Fingerprints
+# -----------------------------
+def file_checksum(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path):
+    file_path = Path(file_path)
+    return {
+        "file": file_path.name,
+        "size_bytes": file_path.stat().st_size,
+        "sha256": file_checksum(file_path)
+    }
+
+
+def fingerprint_files(file_paths):
+    """Fingerprint every existing file, keyed by file name."""
+    return {
+        Path(p).name: file_fingerprint(p)
+        for p in file_paths
+        if Path(p).exists()
+    }
+
+
+def same_fingerprint(a, b):
+    return (
+        a is not None and b is not None
+        and a["size_bytes"] == b["size_bytes"]
+        and a["sha256"] == b["sha256"]
+    )
+
+
+def table_checksum(connection, schema, table, excluded=()):
+    """
+    "<rows>:<checksum>" of a database table's content: the row count and
+    an order-independent sum of per-row hashes over every column not in
+    `excluded`. Any edited, added or removed row changes it.
+    """
+    columns = connection.execute(
+        text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = :schema AND table_name = :table
+            ORDER BY ordinal_position
+        """),
+        {"schema": schema, "table": table}
+    ).scalars().all()
+    row = ", ".join(f't."{c}"' for c in columns if c not in excluded)
+
+    rows, checksum = connection.execute(text(f"""
+        SELECT COUNT(*),
+               SUM(('x' || LEFT(md5(ROW({row})::text), 15))::bit(60)::bigint)
+        FROM {schema}.{table} t
+    """)).one()
+    return f"{rows}:{checksum}"
+
+
+# -----------------------------
+# Cache File
+# -----------------------------
+# {
+#   "ingestion": {<table>: {file, size_bytes, sha256, rows_loaded,
+#                           staging_checksum, loaded_at}},
+#   "pipeline":  {"files": {<file>: fingerprint}, "pipeline_execution_id", "completed_at"}
+# }
+def load_fingerprint_cache():
+    if not CACHE_FILE.exists():
+        return {"ingestion": {}, "pipeline": {}}
+
+    with open(CACHE_FILE) as f:
+        cache = json.load(f)
+    cache.setdefault("ingestion", {})
+    cache.setdefault("pipeline", {})
+    return cache
+
+
+def save_fingerprint_cache(cache):
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=4)
+
+
+def pipeline_inputs_unchanged(cache, current_files):
+    """True when the last successful pipeline run saw byte-identical files."""
+    previous = cache.get("pipeline", {}).get("files")
+    if not previous or set(previous) != set(current_files):
+        return False
+    return all(same_fingerprint(previous[name], current_files[name]) for name in current_files)
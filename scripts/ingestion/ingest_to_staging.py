@@ -1,4 +1,3 @@
-import pandas as pd
 import time
 import json
 import logging
@@ -6,11 +5,31 @@ from pathlib import Path
 from datetime import datetime
 import yaml
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 
+# Allow `python scripts/ingestion/ingest_to_staging.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.ingestion.copy_loader import copy_csv_stream
+from scripts.ingestion.fingerprint_cache import (
+    file_checksum,
+    file_fingerprint,
+    load_fingerprint_cache,
+    same_fingerprint,
+    save_fingerprint_cache,
+    table_checksum
+)
+from scripts.storage_formats import RAW_TABLES, open_as_csv, raw_file_name, read_frames
+
 
 # -----------------------------
 # Paths
@@ -47,8 +66,33 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 
 DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+INGESTION_CONFIG = config.get("ingestion", {})
 
-DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# "copy" streams each CSV with COPY FROM STDIN; "insert" is the pandas to_sql path
+LOAD_METHOD = INGESTION_CONFIG.get("load_method", "copy")
+
+# Parallel mode loads each table on its own pooled connection
+PARALLEL = INGESTION_CONFIG.get("parallel", False)
+MAX_WORKERS = INGESTION_CONFIG.get("max_workers", 4)
+
+# "full" truncates and reloads; "incremental" merges only new/changed rows
+INGESTION_MODE = INGESTION_CONFIG.get("mode", "full")
+
+# Raw files are read in the format data generation wrote them in
+RAW_FORMAT = config.get("storage", {}).get("raw_format", "csv")
+
+# Rows per typed chunk read by the insert loader
+READ_CHUNK_SIZE = config.get("pipeline", {}).get("batch_size", 1000)
+
+# Full mode: skip tables whose raw file is byte-identical to the last load
+SKIP_UNCHANGED = config.get("pipeline", {}).get("skip_unchanged_inputs", True)
+
+TABLE_KEYS = {
+    "customers": "customer_id",
+    "products": "product_id",
+    "transactions": "transaction_id",
+    "transaction_items": "item_id"
+}
 
 # -----------------------------
 # Validation Function
@@ -60,6 +104,381 @@ def validate_staging_load(engine, table_name, csv_rows):
     return result == csv_rows, result
 
 
+# -----------------------------
+# Table Loaders
+# -----------------------------
+# `raw_table` names the raw file's table when loading into a differently
+# named target (the incremental scratch table); columnar files need it to
+# pick their schema.
+def load_with_copy(connection, table, file_path, schema="staging", raw_table=None):
+    qualified = f"{schema}.{table}" if schema else table
+    with open_as_csv(file_path, raw_table or table, RAW_FORMAT) as stream:
+        return copy_csv_stream(connection, qualified, stream)
+
+
+def load_with_insert(connection, table, file_path, schema="staging", raw_table=None):
+    # Typed chunks from the schema registry keep memory bounded by batch size
+    rows_loaded = 0
+    for chunk in read_frames(file_path, raw_table or table, RAW_FORMAT, READ_CHUNK_SIZE):
+        chunk.to_sql(
+            table,
+            con=connection,
+            schema=schema,
+            if_exists="append",
+            index=False,
+            method="multi"
+        )
+        rows_loaded += len(chunk)
+    return rows_loaded
+
+
+LOADERS = {
+    "copy": load_with_copy,
+    "insert": load_with_insert
+}
+
+
+# -----------------------------
+# Incremental State
+# -----------------------------
+def ensure_state_table(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS staging.ingestion_state (
+            table_name VARCHAR(50) PRIMARY KEY,
+            file_checksum VARCHAR(64),
+            high_water_mark TIMESTAMP,
+            previous_high_water_mark TIMESTAMP,
+            consumed_high_water_mark TIMESTAMP,
+            rows_changed INTEGER,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    # State tables created before the consumer mark existed
+    connection.execute(text(
+        "ALTER TABLE staging.ingestion_state "
+        "ADD COLUMN IF NOT EXISTS consumed_high_water_mark TIMESTAMP"
+    ))
+
+
+def get_ingestion_state(connection, table):
+    return connection.execute(
+        text("""
+            SELECT file_checksum, high_water_mark
+            FROM staging.ingestion_state
+            WHERE table_name = :table
+        """),
+        {"table": table}
+    ).mappings().first()
+
+
+def save_ingestion_state(connection, table, checksum, rows_changed):
+    """
+    Advance the table's high-water mark to this transaction's timestamp
+    when rows changed; previous_high_water_mark keeps the mark before this
+    run. Ingestion never touches consumed_high_water_mark: downstream reads
+    rows above it and advances it only once they reached production.
+    """
+    connection.execute(
+        text("""
+            INSERT INTO staging.ingestion_state AS s
+                (table_name, file_checksum, high_water_mark,
+                 previous_high_water_mark, rows_changed, updated_at)
+            VALUES
+                (:table, :checksum, now(), NULL, :rows_changed, now())
+            ON CONFLICT (table_name) DO UPDATE SET
+                file_checksum = EXCLUDED.file_checksum,
+                previous_high_water_mark = s.high_water_mark,
+                high_water_mark = CASE
+                    WHEN EXCLUDED.rows_changed > 0 THEN now()
+                    ELSE s.high_water_mark
+                END,
+                rows_changed = EXCLUDED.rows_changed,
+                updated_at = now()
+        """),
+        {"table": table, "checksum": checksum, "rows_changed": rows_changed}
+    )
+
+
+def staging_columns(connection, table):
+    return connection.execute(
+        text("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = 'staging'
+              AND table_name = :table
+              AND column_name <> 'loaded_at'
+            ORDER BY ordinal_position
+        """),
+        {"table": table}
+    ).scalars().all()
+
+
+def merge_staging_table(connection, table, file_path, load_table):
+    """
+    Load the file into a scratch table and merge it into staging.<table>.
+    Only rows that are new or whose content differs are written, and they
+    are stamped with this transaction's loaded_at. Returns
+    (rows_read, rows_changed).
+    """
+    key = TABLE_KEYS[table]
+    # A regular (unlogged) table created and dropped in this transaction:
+    # transactions that touched temp tables cannot be prepared, which the
+    # parallel load's two-phase commit needs
+    incoming = f"incoming_{table}"
+    columns = staging_columns(connection, table)
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != key)
+
+    connection.execute(text(
+        f"CREATE UNLOGGED TABLE staging.{incoming} "
+        f"(LIKE staging.{table} INCLUDING DEFAULTS)"
+    ))
+    rows_read = load_table(connection, incoming, file_path, raw_table=table)
+
+    rows_changed = connection.execute(text(f"""
+        INSERT INTO staging.{table} AS s ({column_list}, loaded_at)
+        SELECT {column_list}, now() FROM staging.{incoming}
+        ON CONFLICT ({key}) DO UPDATE SET
+            {updates},
+            loaded_at = EXCLUDED.loaded_at
+        WHERE ({", ".join(f"s.{c}" for c in columns)})
+            IS DISTINCT FROM ({", ".join(f"EXCLUDED.{c}" for c in columns)})
+    """)).rowcount
+
+    # Every key in the file must now be present in staging
+    missing = connection.execute(text(f"""
+        SELECT COUNT(*) FROM staging.{incoming} i
+        LEFT JOIN staging.{table} s ON s.{key} = i.{key}
+        WHERE s.{key} IS NULL
+    """)).scalar()
+    if missing:
+        raise ValueError(f"Incremental merge for {table} left {missing} keys unloaded")
+
+    connection.execute(text(f"DROP TABLE staging.{incoming}"))
+    return rows_read, rows_changed
+
+
+def load_staging_table_incremental(connection, table, file_path, load_table):
+    checksum = file_checksum(file_path)
+    state = get_ingestion_state(connection, table)
+
+    if state is not None and state["file_checksum"] == checksum:
+        logging.info(f"{file_path.name} unchanged since last load, skipping staging.{table}")
+        save_ingestion_state(connection, table, checksum, 0)
+        return {"rows_loaded": 0, "rows_changed": 0, "skipped": True}
+
+    logging.info(f"Merging {file_path.name} into staging.{table} (incremental)")
+    rows_read, rows_changed = merge_staging_table(connection, table, file_path, load_table)
+    save_ingestion_state(connection, table, checksum, rows_changed)
+    return {"rows_loaded": rows_read, "rows_changed": rows_changed, "skipped": False}
+
+
+# -----------------------------
+# Per-Table Load
+# -----------------------------
+def load_staging_table(connection, table, file_name, load_table, cached_load=None):
+    """
+    Load and validate one staging table on `connection`: truncate-and-reload
+    in full mode, merge-by-key in incremental mode.
+    `cached_load` is the fingerprint-cache entry of the last load when the
+    raw file is byte-identical to it; in full mode the table is then left
+    as is, provided staging still holds exactly the content that load
+    wrote (same checksum, not just the same row count).
+    Does not commit; the caller owns the transaction.
+    """
+    start = time.time()
+    file_path = RAW_DATA_DIR / file_name
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"Missing file: {file_name}")
+
+    if INGESTION_MODE == "incremental":
+        result = load_staging_table_incremental(connection, table, file_path, load_table)
+        return {
+            **result,
+            "status": "success",
+            "error_message": None,
+            "duration_seconds": round(time.time() - start, 2)
+        }
+
+    if cached_load is not None:
+        if table_checksum(connection, "staging", table) == cached_load.get("staging_checksum"):
+            logging.info(f"{file_name} unchanged since last load, skipping staging.{table}")
+            return {
+                "rows_loaded": 0,
+                "skipped": True,
+                "skip_reason": "raw file unchanged since last load",
+                "status": "success",
+                "error_message": None,
+                "duration_seconds": round(time.time() - start, 2)
+            }
+
+    logging.info(f"Truncating staging.{table}")
+    connection.execute(text(f"TRUNCATE staging.{table}"))
+
+    logging.info(f"Loading {file_name} into staging.{table} ({LOAD_METHOD})")
+    rows_loaded = load_table(connection, table, file_path)
+
+    valid, db_count = validate_staging_load(
+        connection, table, rows_loaded
+    )
+
+    if not valid:
+        raise ValueError(
+            f"Row count mismatch for {table}: CSV={rows_loaded}, DB={db_count}"
+        )
+
+    result = {"rows_loaded": rows_loaded}
+    if SKIP_UNCHANGED:
+        # Lets the next run with the same raw file verify staging is intact
+        result["staging_checksum"] = table_checksum(connection, "staging", table)
+
+    return {
+        **result,
+        "status": "success",
+        "error_message": None,
+        "duration_seconds": round(time.time() - start, 2)
+    }
+
+
+def ingest_sequential(engine, tables, load_table, summary, cached_loads):
+    with engine.begin() as connection:  # BEGIN TRANSACTION
+        logging.info("Transaction started")
+
+        for table, file_name in tables.items():
+            summary["tables_loaded"][f"staging.{table}"] = load_staging_table(
+                connection, table, file_name, load_table, cached_loads.get(table)
+            )
+
+
+def prepared_transactions_available(engine, needed):
+    """Whether the server can hold `needed` prepared transactions at once."""
+    with engine.connect() as connection:
+        allowed = connection.execute(text("SHOW max_prepared_transactions")).scalar()
+    return int(allowed) >= needed
+
+
+def commit_prepared(engine, transactions):
+    """
+    Second phase of the parallel load: commit every prepared transaction.
+    Once all are prepared the outcome is decided, so a commit that fails
+    (e.g. a dropped connection) is retried on a fresh connection; the
+    prepared transaction survives on the server until then.
+    """
+    unfinished = []
+    for transaction in transactions:
+        try:
+            transaction.commit()
+        except Exception as e:
+            logging.warning(f"Commit of prepared transaction {transaction.xid} failed: {e}")
+            # Dropping the session keeps the prepared transaction on the
+            # server; closing it normally would roll it back
+            transaction.connection.invalidate()
+            unfinished.append(transaction.xid)
+
+    for xid in list(unfinished):
+        try:
+            with engine.connect() as connection:
+                connection.commit_prepared(xid, recover=True)
+            unfinished.remove(xid)
+        except Exception as e:
+            logging.error(f"Retrying COMMIT PREPARED '{xid}' failed: {e}")
+
+    if unfinished:
+        raise RuntimeError(
+            "Staging load is prepared but not fully committed; finish it with "
+            + "; ".join(f"COMMIT PREPARED '{xid}'" for xid in unfinished)
+        )
+
+
+def ingest_parallel(engine, tables, load_table, summary, cached_loads):
+    """
+    Load every table on its own pooled connection in a thread pool, all or
+    nothing, with a two-phase commit. Each worker truncates, loads and
+    validates inside an open transaction and hands it back uncommitted.
+    Only when every table validated are the transactions prepared, and
+    only when every one prepared are they committed; a failure before
+    that rolls all of them back.
+    """
+    connections = []
+    open_transactions = []
+    errors = []
+
+    def open_and_load(table, file_name):
+        connection = engine.connect()
+        connections.append(connection)
+        open_transactions.append(connection.begin_twophase())
+        return load_staging_table(
+            connection, table, file_name, load_table, cached_loads.get(table)
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {
+                table: executor.submit(open_and_load, table, file_name)
+                for table, file_name in tables.items()
+            }
+
+            for table, future in futures.items():
+                try:
+                    summary["tables_loaded"][f"staging.{table}"] = future.result()
+                except Exception as e:
+                    errors.append(e)
+
+        try:
+            if errors:
+                raise errors[0]
+            for transaction in open_transactions:
+                transaction.prepare()
+        except Exception:
+            logging.error("Parallel ingestion failed, rolling back every table")
+            for transaction in open_transactions:
+                transaction.rollback()
+            raise
+
+        commit_prepared(engine, open_transactions)
+        logging.info("All table transactions committed")
+
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+# -----------------------------
+# Fingerprint Cache
+# -----------------------------
+def find_unchanged_loads(tables, cache):
+    """Map table -> cached load entry for raw files identical to that load."""
+    if not SKIP_UNCHANGED or INGESTION_MODE != "full":
+        return {}, {}
+
+    fingerprints = {
+        table: file_fingerprint(RAW_DATA_DIR / file_name)
+        for table, file_name in tables.items()
+        if (RAW_DATA_DIR / file_name).exists()
+    }
+    unchanged = {
+        table: cache["ingestion"][table]
+        for table, fingerprint in fingerprints.items()
+        if same_fingerprint(cache["ingestion"].get(table), fingerprint)
+    }
+    return fingerprints, unchanged
+
+
+def record_fingerprints(cache, fingerprints, summary):
+    for table, fingerprint in fingerprints.items():
+        loaded = summary["tables_loaded"][f"staging.{table}"]
+        if loaded.get("skipped"):
+            continue
+        cache["ingestion"][table] = {
+            **fingerprint,
+            "rows_loaded": loaded["rows_loaded"],
+            "staging_checksum": loaded.get("staging_checksum"),
+            "loaded_at": summary["ingestion_timestamp"]
+        }
+    save_fingerprint_cache(cache)
+
+
 # -----------------------------
 # Main Ingestion Logic
 # -----------------------------
@@ -67,62 +486,45 @@ def ingest_to_staging():
     start_time = time.time()
     summary = {
         "ingestion_timestamp": datetime.utcnow().isoformat(),
+        "load_method": LOAD_METHOD,
+        "ingestion_mode": INGESTION_MODE,
+        "parallel": PARALLEL,
+        "raw_format": RAW_FORMAT,
         "tables_loaded": {},
         "total_execution_time_seconds": 0
     }
 
-    engine = create_engine(DB_URL)
-
-    tables = {
-        "customers": "customers.csv",
-        "products": "products.csv",
-        "transactions": "transactions.csv",
-        "transaction_items": "transaction_items.csv"
-    }
-
-    try:
-        with engine.begin() as connection:  # BEGIN TRANSACTION
-            logging.info("Transaction started")
-
-            for table, file_name in tables.items():
-                file_path = RAW_DATA_DIR / file_name
+    engine = create_engine(DB_URL, pool_size=MAX_WORKERS)
 
-                if not file_path.exists():
-                    raise FileNotFoundError(f"Missing file: {file_name}")
+    tables = {table: raw_file_name(table, RAW_FORMAT) for table in RAW_TABLES}
 
-                df = pd.read_csv(file_path)
+    load_table = LOADERS[LOAD_METHOD]
+    ingest = ingest_parallel if PARALLEL else ingest_sequential
 
-                logging.info(f"Truncating staging.{table}")
-                connection.execute(text(f"TRUNCATE staging.{table}"))
-
-                logging.info(f"Loading {len(df)} rows into staging.{table}")
-                df.to_sql(
-                    table,
-                    con=connection,
-                    schema="staging",
-                    if_exists="append",
-                    index=False,
-                    method="multi"
-                )
+    try:
+        if INGESTION_MODE == "incremental":
+            with engine.begin() as connection:
+                ensure_state_table(connection)
 
-                valid, db_count = validate_staging_load(
-                    connection, table, len(df)
-                )
+        cache = load_fingerprint_cache()
+        fingerprints, cached_loads = find_unchanged_loads(tables, cache)
 
-                if not valid:
-                    raise ValueError(
-                        f"Row count mismatch for {table}: CSV={len(df)}, DB={db_count}"
-                    )
+        if PARALLEL and not prepared_transactions_available(engine, len(tables)):
+            # Without two-phase commit only a single transaction is atomic
+            logging.warning(
+                "max_prepared_transactions is too low for an all-or-nothing "
+                "parallel load, loading the tables sequentially"
+            )
+            ingest = ingest_sequential
+            summary["parallel"] = False
 
-                summary["tables_loaded"][f"staging.{table}"] = {
-                    "rows_loaded": len(df),
-                    "status": "success",
-                    "error_message": None
-                }
+        ingest(engine, tables, load_table, summary, cached_loads)
+        logging.info("All tables loaded successfully")
 
-            logging.info("All tables loaded successfully")
+        if fingerprints:
+            record_fingerprints(cache, fingerprints, summary)
 
-    except (FileNotFoundError, SQLAlchemyError, ValueError) as e:
+    except (FileNotFoundError, SQLAlchemyError, psycopg2.Error, ValueError) as e:
         logging.error(str(e))
         summary["tables_loaded"]["error"] = {
             "status": "failed",
@@ -140,6 +542,8 @@ def ingest_to_staging():
 
         logging.info("Ingestion summary written")
 
+        engine.dispose()
+
     print("✅ Data ingestion into staging completed successfully")
 
 
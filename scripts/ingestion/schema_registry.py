@@ -0,0 +1,117 @@
+import re
+from pathlib import Path
+
+import pandas as pd
+
+# -----------------------------
+# Source Of Truth
+# -----------------------------
+# Raw column names and types are read from the staging DDL so the files
+# we generate, the dtypes we parse them with and the tables we load them
+# into cannot drift apart.
+STAGING_DDL = Path(__file__).resolve().parents[2] / "sql" / "ddl" / "01_create_staging_schema.sql"
+
+RAW_TABLES = ["customers", "products", "transactions", "transaction_items"]
+
+# Columns filled by the database, never present in raw files
+AUDIT_COLUMNS = {"loaded_at"}
+
+# Low-cardinality text columns, parsed as pandas categoricals
+CATEGORICAL_COLUMNS = {
+    "customers": {"state", "country", "age_group"},
+    "products": {"category", "sub_category"},
+    "transactions": {"payment_method"},
+    "transaction_items": set()
+}
+
+# SQL type prefix -> logical type shared by the CSV and Arrow readers
+SQL_LOGICAL_TYPES = {
+    "VARCHAR": "string",
+    "TEXT": "string",
+    "DATE": "date",
+    "TIME": "time",
+    "DECIMAL": "float",
+    "NUMERIC": "float",
+    "INTEGER": "int",
+    "BIGINT": "int"
+}
+
+PANDAS_DTYPES = {
+    "string": "string",
+    "float": "float64",
+    "int": "Int64",
+    # TIME values stay "HH:MM:SS" strings; PostgreSQL parses them on load
+    "time": "string"
+}
+
+_CREATE_TABLE = re.compile(
+    r"CREATE TABLE IF NOT EXISTS staging\.(\w+)\s*\((.*?)\n\);",
+    re.DOTALL
+)
+
+
+# -----------------------------
+# DDL Parsing
+# -----------------------------
+def parse_staging_ddl(ddl_path: Path = STAGING_DDL) -> dict:
+    """Return {table: {column: SQL type}} for every staging table in the DDL."""
+    tables = {}
+    for table, body in _CREATE_TABLE.findall(Path(ddl_path).read_text()):
+        columns = {}
+        for line in body.splitlines():
+            parts = line.strip().rstrip(",").split()
+            if len(parts) < 2 or parts[0].isupper():
+                continue
+            columns[parts[0]] = parts[1].split("(")[0].upper()
+        tables[table] = columns
+    return tables
+
+
+_registry = None
+
+
+def get_registry() -> dict:
+    """Logical column types of the raw tables, parsed once per process."""
+    global _registry
+    if _registry is None:
+        staging = parse_staging_ddl()
+        _registry = {
+            table: {
+                column: SQL_LOGICAL_TYPES[sql_type]
+                for column, sql_type in staging[table].items()
+                if column not in AUDIT_COLUMNS
+            }
+            for table in RAW_TABLES
+        }
+    return _registry
+
+
+def raw_column_types(table: str) -> dict:
+    return get_registry()[table]
+
+
+# -----------------------------
+# Typed Reads
+# -----------------------------
+def pandas_dtypes(table: str) -> dict:
+    """read_csv dtype map; date columns are handled by parse_dates instead."""
+    categorical = CATEGORICAL_COLUMNS[table]
+    return {
+        column: "category" if column in categorical else PANDAS_DTYPES[logical]
+        for column, logical in raw_column_types(table).items()
+        if logical != "date"
+    }
+
+
+def date_columns(table: str) -> list:
+    return [c for c, logical in raw_column_types(table).items() if logical == "date"]
+
+
+def read_csv_chunks(file_path: Path, table: str, chunksize: int):
+    """Iterate a raw CSV in typed chunks of at most `chunksize` rows."""
+    return pd.read_csv(
+        file_path,
+        dtype=pandas_dtypes(table),
+        parse_dates=date_columns(table),
+        chunksize=chunksize
+    )
@@ -0,0 +1,213 @@
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+# Allow `python scripts/monitoring/index_advisor.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.transformation.analytical_queries import load_queries
+from scripts.transformation.warehouse_layout import derive_fact_indexes, fact_columns
+
+# -------------------------------------------------
+# Environment & Paths
+# -------------------------------------------------
+load_dotenv()
+
+DB_URL = (
+    f"postgresql+psycopg2://{os.getenv('DB_USER')}:"
+    f"{os.getenv('DB_PASSWORD')}@"
+    f"{os.getenv('DB_HOST')}:"
+    f"{os.getenv('DB_PORT')}/"
+    f"{os.getenv('DB_NAME')}"
+)
+
+engine = create_engine(DB_URL)
+
+REPORT_DIR = Path("data/processed")
+ADVISOR_REPORT = REPORT_DIR / "index_advisor_report.json"
+
+SCHEMA = "warehouse"
+
+# Sequential scans averaging fewer rows than this are cheaper than any index
+SEQ_SCAN_MIN_ROWS = 10000
+
+
+# -------------------------------------------------
+# Catalog Reads
+# -------------------------------------------------
+# Partition indexes and tables are rolled up into their partitioned
+# parent, so a monthly-partitioned fact_sales reports as one table
+def list_indexes(conn) -> list:
+    """Every index on the schema's tables with its columns, scans and size."""
+    rows = conn.execute(text("""
+        SELECT
+            idx.relname AS index_name,
+            tbl.relname AS table_name,
+            ix.indisunique AS is_unique,
+            ARRAY(
+                SELECT a.attname
+                FROM unnest(ix.indkey::int2[]) WITH ORDINALITY k(attnum, n)
+                JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+                ORDER BY k.n
+            ) AS columns,
+            ix.indnkeyatts AS key_count,
+            COALESCE(usage.scans, 0) AS scans,
+            COALESCE(usage.bytes, 0) AS size_bytes
+        FROM pg_index ix
+        JOIN pg_class idx ON idx.oid = ix.indexrelid
+        JOIN pg_class tbl ON tbl.oid = ix.indrelid
+        JOIN pg_namespace ns ON ns.oid = tbl.relnamespace
+        LEFT JOIN (
+            SELECT
+                COALESCE(i.inhparent, s.indexrelid) AS index_oid,
+                SUM(s.idx_scan) AS scans,
+                SUM(pg_relation_size(s.indexrelid)) AS bytes
+            FROM pg_stat_user_indexes s
+            LEFT JOIN pg_inherits i ON i.inhrelid = s.indexrelid
+            GROUP BY 1
+        ) usage ON usage.index_oid = ix.indexrelid
+        WHERE ns.nspname = :schema
+          AND tbl.relkind IN ('r', 'p')
+          AND NOT tbl.relispartition
+        ORDER BY tbl.relname, idx.relname
+    """), {"schema": SCHEMA}).mappings()
+
+    return [
+        {
+            "index": row["index_name"],
+            "table": row["table_name"],
+            "unique": row["is_unique"],
+            "keys": list(row["columns"][:row["key_count"]]),
+            "include": list(row["columns"][row["key_count"]:]),
+            "scans": int(row["scans"]),
+            "size_bytes": int(row["size_bytes"])
+        }
+        for row in rows
+    ]
+
+
+def table_scan_stats(conn) -> list:
+    return [dict(row) for row in conn.execute(text("""
+        SELECT
+            COALESCE(parent.relname, s.relname) AS table_name,
+            SUM(s.seq_scan)::BIGINT AS seq_scans,
+            SUM(s.seq_tup_read)::BIGINT AS seq_rows_read,
+            SUM(COALESCE(s.idx_scan, 0))::BIGINT AS index_scans,
+            SUM(s.n_live_tup)::BIGINT AS live_rows
+        FROM pg_stat_user_tables s
+        LEFT JOIN pg_inherits i ON i.inhrelid = s.relid
+        LEFT JOIN pg_class parent ON parent.oid = i.inhparent
+        WHERE s.schemaname = :schema
+        GROUP BY 1
+        ORDER BY 1
+    """), {"schema": SCHEMA}).mappings()]
+
+
+# -------------------------------------------------
+# Advice
+# -------------------------------------------------
+def unused_indexes(indexes: list) -> list:
+    """Non-unique indexes never scanned since the statistics were reset."""
+    return [
+        {"index": i["index"], "table": i["table"], "size_bytes": i["size_bytes"]}
+        for i in indexes
+        if not i["unique"] and i["scans"] == 0
+    ]
+
+
+def _covers(wide: dict, keys: list, include: list) -> bool:
+    """`wide` serves lookups on `keys` and carries every `include` column."""
+    return (
+        wide["keys"][:len(keys)] == keys
+        and set(include) <= set(wide["keys"]) | set(wide["include"])
+    )
+
+
+def redundant_indexes(indexes: list) -> list:
+    """Non-unique indexes whose work another index on the table already does."""
+    redundant = []
+    for narrow in indexes:
+        if narrow["unique"]:
+            continue
+        for wide in indexes:
+            if (
+                wide is not narrow
+                and wide["table"] == narrow["table"]
+                and len(wide["keys"]) + len(wide["include"]) > len(narrow["keys"]) + len(narrow["include"])
+                and _covers(wide, narrow["keys"], narrow["include"])
+            ):
+                redundant.append({
+                    "index": narrow["index"],
+                    "table": narrow["table"],
+                    "covered_by": wide["index"],
+                    "size_bytes": narrow["size_bytes"]
+                })
+                break
+    return redundant
+
+
+def missing_indexes(indexes: list, derived: dict) -> list:
+    """Registry-derived fact_sales indexes no existing index provides."""
+    fact_indexes = [i for i in indexes if i["table"] == "fact_sales"]
+    return [
+        {"index": name, "keys": spec["keys"], "include": spec["include"], "queries": spec["queries"]}
+        for name, spec in derived.items()
+        if not any(_covers(i, spec["keys"], spec["include"]) for i in fact_indexes)
+    ]
+
+
+def seq_scan_heavy_tables(stats: list) -> list:
+    """Tables read mostly by large sequential scans."""
+    heavy = []
+    for table in stats:
+        if not table["seq_scans"]:
+            continue
+        avg_rows = table["seq_rows_read"] / table["seq_scans"]
+        if avg_rows >= SEQ_SCAN_MIN_ROWS and table["seq_scans"] > table["index_scans"]:
+            heavy.append({**table, "avg_rows_per_seq_scan": round(avg_rows)})
+    return heavy
+
+
+# -------------------------------------------------
+# Main Runner
+# -------------------------------------------------
+def run_index_advisor() -> dict:
+    with engine.connect() as conn:
+        indexes = list_indexes(conn)
+        stats = table_scan_stats(conn)
+        derived = derive_fact_indexes(load_queries(), fact_columns(conn))
+        stats_reset = conn.execute(text(
+            "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+        )).scalar()
+
+    report = {
+        "advisor_timestamp": datetime.now(timezone.utc).isoformat(),
+        "statistics_since": stats_reset.isoformat() if stats_reset else None,
+        "unused_indexes": unused_indexes(indexes),
+        "redundant_indexes": redundant_indexes(indexes),
+        "missing_indexes": missing_indexes(indexes, derived),
+        "seq_scan_heavy_tables": seq_scan_heavy_tables(stats),
+        "indexes": indexes
+    }
+
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(ADVISOR_REPORT, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print(
+        f"🧭 Index advisor: {len(report['unused_indexes'])} unused, "
+        f"{len(report['redundant_indexes'])} redundant, "
+        f"{len(report['missing_indexes'])} missing"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    run_index_advisor()
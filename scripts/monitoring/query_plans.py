@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+# Allow `python scripts/monitoring/query_plans.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.transformation.analytical_queries import (
+    bind_names,
+    load_queries,
+    prepare_query,
+    resolve_params
+)
+
+# -------------------------------------------------
+# Environment & Paths
+# -------------------------------------------------
+load_dotenv()
+
+DB_URL = (
+    f"postgresql+psycopg2://{os.getenv('DB_USER')}:"
+    f"{os.getenv('DB_PASSWORD')}@"
+    f"{os.getenv('DB_HOST')}:"
+    f"{os.getenv('DB_PORT')}/"
+    f"{os.getenv('DB_NAME')}"
+)
+
+engine = create_engine(DB_URL)
+
+with open(PROJECT_ROOT / "config" / "config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+PLAN_CONFIG = config.get("analytics", {}).get("query_plans", {})
+QUERY_PARAMS = config.get("analytics", {}).get("query_params") or {}
+
+# Each query is explained this many times; latency is the median run
+RUNS = max(1, PLAN_CONFIG.get("runs", 3))
+# Slower than baseline by more than this percentage AND this many ms
+LATENCY_REGRESSION_PCT = PLAN_CONFIG.get("latency_regression_pct", 50)
+MIN_REGRESSION_MS = PLAN_CONFIG.get("min_regression_ms", 5)
+
+REPORT_DIR = Path("data/processed")
+BASELINE_FILE = REPORT_DIR / "query_plan_baseline.json"
+PLAN_REPORT = REPORT_DIR / "query_plan_report.json"
+
+
+# -------------------------------------------------
+# Plan Metrics
+# -------------------------------------------------
+def iter_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+# Appends over partitions grow a child per partition as data arrives;
+# identical children are collapsed so that growth alone is not a new plan
+APPEND_NODES = {"Append", "Merge Append"}
+
+
+def partition_parents(conn) -> dict:
+    """Top-level parent of every partition and partition index, by name."""
+    parents = dict(conn.execute(text("""
+        SELECT child.relname, parent.relname
+        FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+    """)).all())
+
+    def root(name):
+        while name in parents:
+            name = parents[name]
+        return name
+
+    return {name: root(name) for name in parents}
+
+
+def plan_shape(node, parents=None) -> str:
+    """
+    Node types and scanned relations as a nested string, costs excluded.
+    Partitions and their indexes are named after their parent via
+    `parents` (see partition_parents).
+    """
+    parents = parents or {}
+    label = node["Node Type"]
+    if "Relation Name" in node:
+        label += f"[{parents.get(node['Relation Name'], node['Relation Name'])}]"
+    if "Index Name" in node:
+        label += f"[{parents.get(node['Index Name'], node['Index Name'])}]"
+
+    children = [plan_shape(child, parents) for child in node.get("Plans", [])]
+    if node["Node Type"] in APPEND_NODES:
+        children = sorted(set(children))
+    return f"{label}({','.join(children)})" if children else label
+
+
+def plan_metrics(explain: dict, parents=None) -> dict:
+    """Key figures of one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) result."""
+    parents = parents or {}
+    root = explain["Plan"]
+    shape = plan_shape(root, parents)
+    return {
+        "execution_time_ms": round(explain["Execution Time"], 3),
+        "planning_time_ms": round(explain["Planning Time"], 3),
+        "total_cost": root["Total Cost"],
+        "rows": root["Actual Rows"],
+        # Buffer counts on the root node include every child node
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+        "seq_scans": sorted({
+            parents.get(n.get("Relation Name"), n.get("Relation Name", "?"))
+            for n in iter_nodes(root) if n["Node Type"] == "Seq Scan"
+        }),
+        "plan_shape": shape,
+        "plan_hash": hashlib.md5(shape.encode("utf-8")).hexdigest()[:12]
+    }
+
+
+def explain_query(conn, query: dict, params: dict = None, parents=None) -> dict:
+    """
+    EXPLAIN ANALYZE the query's prepared statement `RUNS` times. Returns the
+    last run's metrics and plan with the median execution time.
+    """
+    if parents is None:
+        parents = partition_parents(conn)
+    name = prepare_query(conn, query)
+    values = resolve_params(query, params)
+    names = bind_names(query["sql"])
+    arguments = f"({', '.join(f':{n}' for n in names)})" if names else ""
+    statement = text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) EXECUTE {name}{arguments}")
+
+    timings = []
+    for _ in range(RUNS):
+        explain = conn.execute(statement, values).scalar()[0]
+        timings.append(explain["Execution Time"])
+
+    metrics = plan_metrics(explain, parents)
+    metrics["execution_time_ms"] = round(statistics.median(timings), 3)
+    metrics["params"] = {k: str(v) for k, v in values.items()}
+    metrics["plan"] = explain["Plan"]
+    return metrics
+
+
+# -------------------------------------------------
+# Baseline Comparison
+# -------------------------------------------------
+def compare_to_baseline(current: dict, baseline: dict) -> dict:
+    """
+    Flag a changed plan shape and latency beyond the thresholds. Row
+    growth is reported alongside so data growth can be told apart from
+    a plan change.
+    """
+    if baseline is None:
+        return {"status": "baseline_created", "flags": []}
+
+    flags = []
+    if current["plan_hash"] != baseline["plan_hash"]:
+        flags.append("plan_changed")
+
+    before, after = baseline["execution_time_ms"], current["execution_time_ms"]
+    slowdown_pct = (after - before) / before * 100 if before else 0.0
+    if slowdown_pct > LATENCY_REGRESSION_PCT and after - before > MIN_REGRESSION_MS:
+        flags.append("latency_regressed")
+
+    rows_before = baseline["rows"]
+    return {
+        "status": "regressed" if flags else "ok",
+        "flags": flags,
+        "baseline_execution_time_ms": before,
+        "latency_change_pct": round(slowdown_pct, 1),
+        "rows_change_pct": (
+            round((current["rows"] - rows_before) / rows_before * 100, 1) if rows_before else None
+        ),
+        "baseline_plan_shape": baseline["plan_shape"]
+    }
+
+
+def load_baseline() -> dict:
+    if not BASELINE_FILE.exists():
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f)
+
+
+def save_baseline(baseline: dict):
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(baseline, f, indent=4)
+
+
+def baseline_key(query: dict, params: dict) -> str:
+    """Plans depend on parameter values, so they are part of the key."""
+    if not params:
+        return query["slug"]
+    values = ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return f"{query['slug']}({values})"
+
+
+# -------------------------------------------------
+# Main Runner
+# -------------------------------------------------
+def capture_query_plans(update_baseline: bool = False) -> dict:
+    """
+    Explain every registered query, compare it against the stored baseline
+    and write query_plan_report.json. Queries without a baseline entry are
+    added to it; `update_baseline` replaces every entry with this run.
+    """
+    baseline = load_baseline()
+    report = {
+        "capture_timestamp": datetime.now(timezone.utc).isoformat(),
+        "runs_per_query": RUNS,
+        "thresholds": {
+            "latency_regression_pct": LATENCY_REGRESSION_PCT,
+            "min_regression_ms": MIN_REGRESSION_MS
+        },
+        "queries": {},
+        "regressions": []
+    }
+
+    with engine.connect() as conn:
+        parents = partition_parents(conn)
+        for query in load_queries():
+            overrides = QUERY_PARAMS.get(query["slug"])
+            key = baseline_key(query, resolve_params(query, overrides))
+            current = explain_query(conn, query, overrides, parents)
+
+            previous = None if update_baseline else baseline.get(key)
+            comparison = compare_to_baseline(current, previous)
+            if previous is None:
+                baseline[key] = {k: v for k, v in current.items() if k != "plan"}
+
+            report["queries"][f"query{query['number']}"] = {
+                "baseline_key": key,
+                **current,
+                **comparison
+            }
+            if comparison["flags"]:
+                report["regressions"].append({
+                    "query": f"query{query['number']}",
+                    "flags": comparison["flags"]
+                })
+
+    save_baseline(baseline)
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(PLAN_REPORT, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"🔎 Query plans captured ({len(report['regressions'])} regressions)")
+    return report
+
+
+if __name__ == "__main__":
+    capture_query_plans(update_baseline="--update-baseline" in sys.argv)
@@ -2,6 +2,7 @@ import sys
 import time
 import json
 import logging
+import yaml
 from pathlib import Path
 from datetime import datetime, timezone
 import traceback
@@ -22,15 +23,43 @@ from scripts.quality_checks.validate_data import run_quality_checks
 from scripts.transformation.staging_to_production import staging_to_production
 from scripts.transformation.load_warehouse import load_warehouse
 from scripts.transformation.generate_analytics import generate_analytics
+from scripts.ingestion.fingerprint_cache import (
+    fingerprint_files,
+    load_fingerprint_cache,
+    pipeline_inputs_unchanged,
+    save_fingerprint_cache
+)
+from scripts.storage_formats import RAW_TABLES, raw_file_name
 
 # ----------------------------------------------------
 # DIRECTORIES
 # ----------------------------------------------------
 LOG_DIR = PROJECT_ROOT / "logs"
 REPORT_DIR = PROJECT_ROOT / "data" / "processed"
+RAW_DATA_DIR = PROJECT_ROOT / "data" / "raw"
+INGESTION_SUMMARY = PROJECT_ROOT / "data" / "staging" / "ingestion_summary.json"
 LOG_DIR.mkdir(exist_ok=True)
 REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
+# ----------------------------------------------------
+# INPUT FINGERPRINT SKIPPING
+# ----------------------------------------------------
+with open(PROJECT_ROOT / "config" / "config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+SKIP_UNCHANGED = config.get("pipeline", {}).get("skip_unchanged_inputs", True)
+
+RAW_FORMAT = config.get("storage", {}).get("raw_format", "csv")
+RAW_FILES = [raw_file_name(table, RAW_FORMAT) for table in RAW_TABLES]
+
+# Stages whose output is fully determined by the raw files via staging
+INPUT_DEPENDENT_STEPS = {
+    "data_quality_checks",
+    "staging_to_production",
+    "warehouse_load",
+    "analytics_generation"
+}
+
 # ----------------------------------------------------
 # LOGGING CONFIGURATION (NO EMOJIS)
 # ----------------------------------------------------
@@ -102,6 +131,45 @@ def run_step(step_name, step_function, report):
             )
             time.sleep(BACKOFF_SECONDS[retries - 1])
 
+def record_skipped_step(step_name, report, reason):
+    report["steps_executed"][step_name] = {
+        "status": "skipped",
+        "duration_seconds": 0,
+        "records_processed": None,
+        "error_message": None,
+        "retry_attempts": 0
+    }
+    report["skip_decisions"]["stages"][step_name] = reason
+    logging.info(f"Skipping step: {step_name} ({reason})")
+
+
+def read_table_skips():
+    """Tables the ingestion step left untouched, from ingestion_summary.json."""
+    if not INGESTION_SUMMARY.exists():
+        return {}
+
+    with open(INGESTION_SUMMARY, encoding="utf-8") as f:
+        tables_loaded = json.load(f).get("tables_loaded", {})
+
+    return {
+        table: loaded.get("skip_reason", "raw file unchanged")
+        for table, loaded in tables_loaded.items()
+        if loaded.get("skipped")
+    }
+
+
+def downstream_can_be_skipped(table_skips, raw_fingerprints, cache):
+    """
+    Downstream stages are skipped only when ingestion skipped every table
+    AND the last fully successful pipeline run saw byte-identical raw files.
+    """
+    return (
+        SKIP_UNCHANGED
+        and len(table_skips) == len(RAW_FILES)
+        and pipeline_inputs_unchanged(cache, raw_fingerprints)
+    )
+
+
 # ----------------------------------------------------
 # MAIN PIPELINE FUNCTION
 # ----------------------------------------------------
@@ -117,6 +185,7 @@ def run_pipeline():
         "status": "running",
         "steps_executed": {},
         "data_quality_summary": {},
+        "skip_decisions": {"tables": {}, "stages": {}},
         "errors": [],
         "warnings": []
     }
@@ -130,13 +199,32 @@ def run_pipeline():
         ("analytics_generation", generate_analytics),
     ]
 
+    cache = load_fingerprint_cache()
+    raw_fingerprints = {}
+    skip_downstream = False
+
     for step_name, step_fn in steps:
+        if skip_downstream and step_name in INPUT_DEPENDENT_STEPS:
+            record_skipped_step(
+                step_name, report,
+                "raw inputs unchanged since "
+                f"{cache['pipeline'].get('pipeline_execution_id')}"
+            )
+            continue
+
         success = run_step(step_name, step_fn, report)
         if not success:
             report["status"] = "failed"
             report["errors"].append(f"{step_name} failed")
             break
 
+        if step_name == "data_ingestion":
+            raw_fingerprints = fingerprint_files(RAW_DATA_DIR / name for name in RAW_FILES)
+            report["skip_decisions"]["tables"] = read_table_skips()
+            skip_downstream = downstream_can_be_skipped(
+                report["skip_decisions"]["tables"], raw_fingerprints, cache
+            )
+
     end_time = datetime.now(timezone.utc)
     report["end_time"] = end_time.isoformat()
     report["total_duration_seconds"] = round(
@@ -146,6 +234,16 @@ def run_pipeline():
     if report["status"] != "failed":
         report["status"] = "success"
 
+        if raw_fingerprints:
+            # Reload: the ingestion step has updated its own section meanwhile
+            cache = load_fingerprint_cache()
+            cache["pipeline"] = {
+                "files": raw_fingerprints,
+                "pipeline_execution_id": pipeline_id,
+                "completed_at": end_time.isoformat()
+            }
+            save_fingerprint_cache(cache)
+
     # ------------------------------------------------
     # WRITE PIPELINE REPORT
     # ------------------------------------------------
@@ -0,0 +1,265 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.ingestion.schema_registry import (
+    RAW_TABLES,
+    date_columns,
+    pandas_dtypes,
+    raw_column_types,
+    read_csv_chunks
+)
+
+# -----------------------------
+# Supported Formats
+# -----------------------------
+# csv is always available; parquet and arrow (IPC file format) need pyarrow,
+# which is imported lazily so CSV-only installs keep working.
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow"
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "The parquet and arrow storage formats require pyarrow "
+            "(pip install pyarrow)"
+        ) from e
+    return pyarrow
+
+
+def raw_file_name(table: str, fmt: str = "csv") -> str:
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported storage format: {fmt}")
+    return f"{table}{FORMAT_EXTENSIONS[fmt]}"
+
+
+def arrow_schema(table: str):
+    """Arrow schema built from the staging DDL via the schema registry."""
+    pa = _require_pyarrow()
+    arrow_types = {
+        "string": pa.string(),
+        "date": pa.date32(),
+        "time": pa.time32("s"),
+        "float": pa.float64(),
+        "int": pa.int64()
+    }
+    return pa.schema([
+        (column, arrow_types[logical])
+        for column, logical in raw_column_types(table).items()
+    ])
+
+
+def to_arrow_table(df: pd.DataFrame, table: str):
+    """Convert a generated frame to an Arrow table with the table's schema."""
+    pa = _require_pyarrow()
+    schema = arrow_schema(table)
+
+    arrays = []
+    for field in schema:
+        column = df[field.name]
+        if pa.types.is_date32(field.type):
+            days = pd.to_datetime(column).to_numpy().astype("datetime64[D]")
+            arrays.append(pa.array(days, type=field.type))
+        elif pa.types.is_time32(field.type):
+            # Accepts "HH:MM:SS" strings and datetime.time objects alike
+            seconds = pd.to_timedelta(column.astype(str)).dt.total_seconds()
+            arrays.append(pa.array(seconds.to_numpy().astype(np.int32), type=field.type))
+        else:
+            arrays.append(pa.array(column, type=field.type, from_pandas=True))
+
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+class TableWriter:
+    """
+    Append-only writer for one raw table in any supported format.
+    CSV chunks are appended to the file; parquet chunks become row groups
+    and arrow chunks become record batches of a single IPC file.
+    """
+
+    def __init__(self, path: Path, table: str, fmt: str = "csv"):
+        self.path = Path(path)
+        self.table = table
+        self.fmt = fmt
+        self._writer = None
+        self._first_chunk = True
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "csv":
+            df.to_csv(
+                self.path,
+                mode="w" if self._first_chunk else "a",
+                header=self._first_chunk,
+                index=False
+            )
+        else:
+            arrow_table = to_arrow_table(df, self.table)
+            if self._writer is None:
+                self._writer = self._open(arrow_table.schema)
+            self._writer.write_table(arrow_table)
+        self._first_chunk = False
+
+    def _open(self, schema):
+        pa = _require_pyarrow()
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema)
+        return pa.ipc.new_file(str(self.path), schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(df: pd.DataFrame, path: Path, table: str, fmt: str = "csv"):
+    with TableWriter(path, table, fmt) as writer:
+        writer.write(df)
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def read_arrow_table(path: Path, table: str, fmt: str):
+    """
+    Read a parquet or arrow file with the table's explicit schema.
+    Both are memory-mapped, so arrow IPC files load without copying.
+    """
+    pa = _require_pyarrow()
+    schema = arrow_schema(table)
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, schema=schema, memory_map=True)
+    if fmt == "arrow":
+        # The returned table's buffers reference the mapping, keeping it open
+        source = pa.memory_map(str(path), "r")
+        return pa.ipc.open_file(source).read_all().cast(schema)
+    raise ValueError(f"{fmt} is not a columnar storage format")
+
+
+def iter_arrow_tables(path: Path, table: str, fmt: str, batch_size: int = 100000):
+    """
+    Yield a parquet or arrow file as Arrow tables of at most `batch_size`
+    rows with the table's schema, reading one batch at a time.
+    """
+    pa = _require_pyarrow()
+    schema = arrow_schema(table)
+
+    def typed(batch):
+        return pa.Table.from_batches([batch]).select(schema.names).cast(schema)
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=schema.names):
+            yield typed(batch)
+    elif fmt == "arrow":
+        reader = pa.ipc.open_file(pa.memory_map(str(path), "r"))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, batch_size):
+                yield typed(batch.slice(offset, batch_size))
+    else:
+        raise ValueError(f"{fmt} is not a columnar storage format")
+
+
+def _typed_frame(arrow_data, table: str) -> pd.DataFrame:
+    df = arrow_data.to_pandas(date_as_object=False)
+    return df.astype(pandas_dtypes(table))
+
+
+def read_frame(path: Path, table: str, fmt: str = "csv") -> pd.DataFrame:
+    """Read a whole raw file with the registry's dtypes."""
+    if fmt == "csv":
+        return pd.read_csv(
+            path, dtype=pandas_dtypes(table), parse_dates=date_columns(table)
+        )
+    return _typed_frame(read_arrow_table(path, table, fmt), table)
+
+
+def read_frames(path: Path, table: str, fmt: str = "csv", chunksize: int = 100000):
+    """Yield typed frames of at most `chunksize` rows from a raw file."""
+    if fmt == "csv":
+        yield from read_csv_chunks(path, table, chunksize)
+        return
+    for arrow_table in iter_arrow_tables(path, table, fmt, batch_size=chunksize):
+        yield _typed_frame(arrow_table, table)
+
+
+class _CSVBatchStream(io.RawIOBase):
+    """
+    Raw byte stream of headered CSV rendered from Arrow tables on demand:
+    the next table is only converted once the reader has consumed the
+    previous one, so at most one batch is held as CSV at a time.
+    """
+
+    def __init__(self, tables, schema):
+        import pyarrow.csv as pa_csv
+
+        self._tables = tables
+        self._sink = io.BytesIO()
+        self._writer = pa_csv.CSVWriter(self._sink, schema)
+        self._pending = bytearray()
+        self._drain()
+
+    def _drain(self):
+        self._pending += self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending and self._tables is not None:
+            arrow_table = next(self._tables, None)
+            if arrow_table is None:
+                self._writer.close()
+                self._tables = None
+                break
+            self._writer.write_table(arrow_table)
+            self._drain()
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        del self._pending[:size]
+        return size
+
+    def close(self):
+        if self._tables is not None:
+            self._tables.close()
+            self._tables = None
+        super().close()
+
+
+def open_as_csv(path: Path, table: str, fmt: str = "csv", batch_size: int = 100000):
+    """
+    Return a readable text stream of headered CSV for COPY FROM STDIN.
+    CSV files are opened as is; columnar files are rendered batch by
+    batch through pyarrow's CSV writer as COPY reads the stream, without
+    a pandas round trip or the whole file in memory.
+    """
+    if fmt == "csv":
+        return open(path, "r", newline="", encoding="utf-8")
+
+    tables = iter_arrow_tables(path, table, fmt, batch_size)
+    stream = _CSVBatchStream(tables, arrow_schema(table))
+    return io.TextIOWrapper(io.BufferedReader(stream), encoding="utf-8", newline="")
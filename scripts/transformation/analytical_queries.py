@@ -0,0 +1,177 @@
+import hashlib
+import re
+from pathlib import Path
+
+from sqlalchemy import text
+
+# ---------------------------------------------------
+# Query File Parsing
+# ---------------------------------------------------
+QUERY_FILE = Path(__file__).resolve().parents[2] / "sql" / "queries" / "analytical_queries.sql"
+
+# Each query starts with a "-- QUERY <n>: <title>" header line
+_HEADER = re.compile(r"^--\s*QUERY\s+(\d+)\s*:\s*(.+?)\s*$", re.MULTILINE)
+
+# Optional "-- Params: name=default, ..." line declaring bind parameters
+_PARAMS = re.compile(r"^--\s*Params\s*:\s*(.+?)\s*$", re.MULTILINE)
+
+# :name placeholders (but not ::type casts)
+_BIND = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+_LIMIT = re.compile(r"\s+LIMIT\s+\d+\s*$", re.IGNORECASE)
+
+
+def _slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+def _strip_comments(block: str) -> str:
+    lines = [line for line in block.splitlines() if not line.strip().startswith("--")]
+    return "\n".join(lines).strip().rstrip(";").strip()
+
+
+def _parse_params(block: str) -> dict:
+    declared = _PARAMS.search(block)
+    if not declared:
+        return {}
+    params = {}
+    for pair in declared.group(1).split(","):
+        name, _, default = pair.partition("=")
+        params[name.strip()] = default.strip()
+    return params
+
+
+def _split_top_level(clause: str) -> list:
+    items, depth, current = [], 0, ""
+    for char in clause:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    return [" ".join(item.split()) for item in items + [current]]
+
+
+def _parse_order_by(sql: str) -> list:
+    """Items of the statement's own ORDER BY, e.g. ["total_revenue DESC"]."""
+    matches = list(_ORDER_BY.finditer(sql))
+    if not matches:
+        return []
+    clause = _LIMIT.sub("", sql[matches[-1].end():])
+    # An ORDER BY inside a window or subquery is followed by its closing paren
+    if clause.count(")") > clause.count("("):
+        return []
+    return _split_top_level(clause)
+
+
+def load_queries(path: Path = QUERY_FILE) -> list:
+    """
+    Parse the analytical query file into
+    [{"number", "title", "slug", "sql", "params", "order_by"}, ...] in file
+    order, where params maps each bind parameter to its declared default
+    and order_by lists the query's top-level ORDER BY items.
+    """
+    raw_sql = Path(path).read_text()
+    headers = list(_HEADER.finditer(raw_sql))
+
+    queries = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(raw_sql)
+        block = raw_sql[header.end():end]
+        sql = _strip_comments(block)
+        if not sql:
+            continue
+
+        params = _parse_params(block)
+        undeclared = set(bind_names(sql)) - set(params)
+        if undeclared:
+            raise ValueError(
+                f"QUERY {header.group(1)} uses undeclared parameters: {sorted(undeclared)}"
+            )
+
+        queries.append({
+            "number": int(header.group(1)),
+            "title": header.group(2),
+            "slug": _slug(header.group(2)),
+            "sql": sql,
+            "params": params,
+            "order_by": _parse_order_by(sql)
+        })
+    return queries
+
+
+# ---------------------------------------------------
+# Parameters
+# ---------------------------------------------------
+def bind_names(sql: str) -> list:
+    """Distinct :name placeholders in order of first use."""
+    return list(dict.fromkeys(_BIND.findall(sql)))
+
+
+def resolve_params(query: dict, overrides: dict = None) -> dict:
+    """The query's defaults updated with `overrides` it actually declares."""
+    params = dict(query["params"])
+    for name, value in (overrides or {}).items():
+        if name not in params:
+            raise ValueError(f"QUERY {query['number']} has no parameter '{name}'")
+        params[name] = value
+    return params
+
+
+def _literal(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def render_sql(query: dict, params: dict = None) -> str:
+    """
+    The query with its parameters inlined as quoted literals, for the
+    places bind parameters cannot reach: view definitions, COPY and
+    server-side cursors. PostgreSQL casts the literals from context.
+    """
+    values = resolve_params(query, params)
+    return _BIND.sub(lambda m: _literal(values[m.group(1)]), query["sql"])
+
+
+# ---------------------------------------------------
+# Prepared Statements
+# ---------------------------------------------------
+# conn.info lives with the pooled DBAPI connection, so this set tracks
+# which statements that server session has already prepared
+PREPARED_KEY = "prepared_analytical_queries"
+
+
+def statement_name(query: dict) -> str:
+    """Per-query name; a changed query text gets a new statement."""
+    digest = hashlib.md5(query["sql"].encode("utf-8")).hexdigest()[:8]
+    return f"analytics_q{query['number']:02d}_{digest}"
+
+
+def prepare_query(conn, query: dict) -> str:
+    """PREPARE the query on this connection unless it already was."""
+    name = statement_name(query)
+    prepared = conn.info.setdefault(PREPARED_KEY, set())
+    if name in prepared:
+        return name
+
+    positions = {p: i for i, p in enumerate(bind_names(query["sql"]), start=1)}
+    body = _BIND.sub(lambda m: f"${positions[m.group(1)]}", query["sql"])
+    # Driver-level execution so psycopg2 does not treat % as a placeholder
+    conn.exec_driver_sql(
+        f"PREPARE {name} AS\n{body}", execution_options={"no_parameters": True}
+    )
+    prepared.add(name)
+    return name
+
+
+def execute_prepared(conn, query: dict, params: dict = None):
+    """Run the query through its prepared statement with bound parameters."""
+    name = prepare_query(conn, query)
+    values = resolve_params(query, params)
+    names = bind_names(query["sql"])
+
+    if not names:
+        return conn.execute(text(f"EXECUTE {name}"))
+    arguments = ", ".join(f":{n}" for n in names)
+    return conn.execute(text(f"EXECUTE {name}({arguments})"), values)
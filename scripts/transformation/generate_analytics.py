@@ -1,12 +1,41 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import json
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from sqlalchemy import create_engine, text
 import os
+import yaml
 from dotenv import load_dotenv
 from datetime import datetime
 
+# Allow `python scripts/transformation/generate_analytics.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.monitoring.query_plans import capture_query_plans
+from scripts.transformation.analytical_queries import (
+    execute_prepared,
+    load_queries,
+    render_sql,
+    resolve_params
+)
+from scripts.transformation.materialized_views import (
+    ensure_materialized_views,
+    read_view_sql
+)
+from scripts.transformation.result_cache import (
+    prune_cache,
+    restore_result,
+    store_result,
+    warehouse_version
+)
+
 # ---------------------------------------------------
 # Load environment variables
 # ---------------------------------------------------
@@ -20,25 +49,240 @@ DB_URL = (
     f"{os.getenv('DB_NAME')}"
 )
 
-engine = create_engine(DB_URL)
-
 OUTPUT_DIR = Path("data/processed/analytics")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+with open(PROJECT_ROOT / "config" / "config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+# Queries run concurrently on at most this many pooled connections
+# (1 runs them one after another)
+MAX_WORKERS = max(1, config.get("analytics", {}).get("max_workers", 4))
+
+engine = create_engine(DB_URL, pool_size=MAX_WORKERS, max_overflow=0)
+
+# Read precomputed results from the warehouse materialized views, which
+# load_warehouse() refreshes after every load
+USE_MATERIALIZED_VIEWS = config.get("analytics", {}).get("materialized_views", True)
+
+# Streaming exports write results to disk chunk by chunk through a
+# server-side cursor instead of loading them into pandas at once
+EXPORT_FORMAT = config.get("analytics", {}).get("export_format", "csv")
+STREAMING_EXPORT = config.get("analytics", {}).get("streaming_export", False)
+STREAM_BATCH_SIZE = config.get("analytics", {}).get("stream_batch_size", 50000)
+
+# Serve results from data/cache/analytics when the warehouse has not
+# changed since they were produced
+RESULT_CACHE = config.get("analytics", {}).get("result_cache", True)
+
+# Per-query parameter overrides keyed by query slug, e.g.
+# monthly_sales_trend: {start_date: 2024-01-01}
+QUERY_PARAMS = config.get("analytics", {}).get("query_params") or {}
+
+# Instrumentation mode: EXPLAIN ANALYZE every query after the export and
+# compare the plans against data/processed/query_plan_baseline.json
+CAPTURE_PLANS = config.get("analytics", {}).get("query_plans", {}).get("enabled", False)
+
+# csv is rendered by pandas, streamed or not, so floats print as Python
+# does (19.6). pg_csv is PostgreSQL's own text output via COPY TO STDOUT,
+# always streamed: numerics keep their scale (19.60) and full precision,
+# NULL is an empty field. The two are not byte-compatible.
+EXPORT_EXTENSIONS = {"csv": ".csv", "pg_csv": ".csv", "parquet": ".parquet"}
+if EXPORT_FORMAT not in EXPORT_EXTENSIONS:
+    raise ValueError(f"Unsupported analytics export format: {EXPORT_FORMAT}")
+
 # ---------------------------------------------------
 # Helper functions
 # ---------------------------------------------------
-def execute_query(conn, sql):
+def execute_query(conn, query, params=None, use_view=False):
+    """
+    Fetch a query's result as a DataFrame, from its materialized view or
+    through its prepared statement.
+    """
     start = time.time()
-    df = pd.read_sql_query(text(sql), conn)
+    if use_view:
+        result = conn.execute(text(read_view_sql(query)))
+    else:
+        result = execute_prepared(conn, query, params)
+    df = records_frame(result.fetchall(), list(result.keys()))
+    if use_view:
+        df = df.drop(columns=["result_rank"])
     elapsed_ms = round((time.time() - start) * 1000, 2)
     return df, elapsed_ms
 
 
+def records_frame(records, columns):
+    """The DataFrame every pandas-rendered export is written from."""
+    return pd.DataFrame.from_records(records, columns=columns, coerce_float=True)
+
+
 def export_to_csv(df, filename):
     df.to_csv(OUTPUT_DIR / filename, index=False)
 
 
+def export_frame(df, filename):
+    if EXPORT_FORMAT == "parquet":
+        df.to_parquet(OUTPUT_DIR / filename, index=False)
+    else:
+        export_to_csv(df, filename)
+
+
+def result_columns(conn, sql):
+    """Column names of a query's result, without running it."""
+    return list(conn.execute(text(f"SELECT * FROM ({sql}) q LIMIT 0")).keys())
+
+
+def export_sql(conn, query, params=None, use_view=False):
+    """
+    SQL whose result is exactly the exported output: the query with its
+    parameters inlined, or its materialized view without result_rank.
+    """
+    if not use_view:
+        return render_sql(query, params)
+    columns = result_columns(conn, read_view_sql(query))
+    return read_view_sql(query, [c for c in columns if c != "result_rank"])
+
+
+def copy_query_to_csv(conn, sql, path):
+    """
+    Write a query's result to a headered CSV file with COPY (query) TO
+    STDOUT, so rows go from the server straight to disk. Returns the row
+    count COPY reported.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", f)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def stream_to_csv(conn, sql, path):
+    """
+    Write a query's result to CSV one fetched batch at a time, rendered by
+    pandas exactly as the DataFrame export does. Returns the row count.
+    """
+    result = conn.execute(
+        text(sql).execution_options(stream_results=True, max_row_buffer=STREAM_BATCH_SIZE)
+    )
+    columns = list(result.keys())
+
+    rows = 0
+    records_frame([], columns).to_csv(path, index=False)
+    for batch in result.partitions(STREAM_BATCH_SIZE):
+        records_frame(batch, columns).to_csv(path, mode="a", header=False, index=False)
+        rows += len(batch)
+    return rows
+
+
+def stream_to_parquet(conn, sql, path):
+    """
+    Write a query's result to Parquet one row group per fetched batch,
+    reading through a server-side cursor. Returns the row count.
+    """
+    result = conn.execute(
+        text(sql).execution_options(stream_results=True, max_row_buffer=STREAM_BATCH_SIZE)
+    )
+    columns = list(result.keys())
+
+    writer = None
+    rows = 0
+    try:
+        for batch in result.partitions(STREAM_BATCH_SIZE):
+            df = records_frame(batch, columns)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        pq.write_table(pa.table({c: pa.array([]) for c in columns}), path)
+    return rows
+
+
+def stream_export(conn, query, filename, params=None, use_view=False):
+    """
+    Export a query without building a DataFrame of its result.
+    Returns (rows, columns, elapsed_ms).
+    """
+    start = time.time()
+    sql = export_sql(conn, query, params, use_view)
+    path = OUTPUT_DIR / filename
+
+    if EXPORT_FORMAT == "parquet":
+        rows = stream_to_parquet(conn, sql, path)
+    elif EXPORT_FORMAT == "pg_csv":
+        rows = copy_query_to_csv(conn, sql, path)
+    else:
+        rows = stream_to_csv(conn, sql, path)
+
+    elapsed_ms = round((time.time() - start) * 1000, 2)
+    return rows, len(result_columns(conn, sql)), elapsed_ms
+
+
+def run_query(query, version=None):
+    """
+    Run one analytical query on its own pooled connection and export it,
+    or restore its export from the result cache when `version` (the
+    warehouse version) has a cached copy.
+    Returns (query_name, result entry for the summary).
+    """
+    query_name = f"query{query['number']}"
+    extension = EXPORT_EXTENSIONS[EXPORT_FORMAT]
+    filename = f"{query_name}{extension}"
+    start = time.time()
+
+    params = QUERY_PARAMS.get(query["slug"])
+    # Views hold the results for the default parameters only
+    use_view = USE_MATERIALIZED_VIEWS and resolve_params(query, params) == query["params"]
+    # Cache entries are keyed on the SQL with its parameter values and on
+    # the export path that writes the file
+    cache_sql = render_sql(query, params)
+    streaming = STREAMING_EXPORT or EXPORT_FORMAT == "pg_csv"
+    exporter = f"{EXPORT_FORMAT}/{'streaming' if streaming else 'dataframe'}"
+
+    if version is not None:
+        cached = restore_result(
+            version, cache_sql, exporter, extension, OUTPUT_DIR / filename
+        )
+        if cached is not None:
+            print(f"▶ Served {query_name} from cache")
+            return query_name, {
+                **cached,
+                "cache": "hit",
+                "wall_time_ms": round((time.time() - start) * 1000, 2)
+            }
+
+    with engine.connect() as conn:
+        if streaming:
+            rows, columns, exec_time = stream_export(conn, query, filename, params, use_view)
+        else:
+            df, exec_time = execute_query(conn, query, params, use_view)
+            export_frame(df, filename)
+            rows, columns = len(df), len(df.columns)
+
+    print(f"▶ Executed {query_name} ({exec_time} ms)")
+
+    result = {"rows": rows, "columns": columns, "execution_time_ms": exec_time}
+    if version is not None:
+        store_result(
+            version, cache_sql, exporter, extension, OUTPUT_DIR / filename, result
+        )
+        result["cache"] = "miss"
+
+    return query_name, {
+        **result,
+        "wall_time_ms": round((time.time() - start) * 1000, 2)
+    }
+
+
 # ---------------------------------------------------
 # Main Analytics Generator
 # ---------------------------------------------------
@@ -47,36 +291,48 @@ def generate_analytics():
 
     summary = {
         "generation_timestamp": datetime.utcnow().isoformat(),
+        "source": "materialized_views" if USE_MATERIALIZED_VIEWS else "warehouse_tables",
+        "max_workers": MAX_WORKERS,
+        "export": {"format": EXPORT_FORMAT, "streaming": STREAMING_EXPORT},
         "queries_executed": 0,
         "query_results": {},
         "total_execution_time_seconds": 0
     }
 
-    sql_file = Path("sql/queries/analytical_queries.sql")
-    raw_sql = sql_file.read_text()
-
-    # Split queries safely
-    queries = [q.strip() for q in raw_sql.split(";") if q.strip().upper().startswith("SELECT")]
+    queries = load_queries()
 
     total_start = time.time()
 
-    with engine.connect() as conn:
-        for idx, query in enumerate(queries, start=1):
-            query_name = f"query{idx}"
-            print(f"▶ Executing {query_name}...")
-
-            df, exec_time = execute_query(conn, query)
+    version = None
+    with engine.begin() as conn:
+        if USE_MATERIALIZED_VIEWS:
+            # No-op unless a view is missing or its query text changed
+            ensure_materialized_views(conn, queries)
+        if RESULT_CACHE:
+            version = warehouse_version(conn)
+            prune_cache(version)
 
-            export_to_csv(df, f"{query_name}.csv")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(partial(run_query, version=version), queries))
 
-            summary["query_results"][query_name] = {
-                "rows": len(df),
-                "columns": len(df.columns),
-                "execution_time_ms": exec_time
-            }
+    # Results keep file order whatever order the queries finished in
+    summary["query_results"] = dict(results)
+    summary["queries_executed"] = len(queries)
+    summary["total_execution_time_seconds"] = round(time.time() - total_start, 2)
+    if RESULT_CACHE:
+        outcomes = [r["cache"] for _, r in results]
+        summary["cache"] = {
+            "warehouse_version": version,
+            "hits": outcomes.count("hit"),
+            "misses": outcomes.count("miss")
+        }
+    summary["sum_of_query_wall_times_seconds"] = round(
+        sum(r["wall_time_ms"] for _, r in results) / 1000, 2
+    )
 
-        summary["queries_executed"] = len(queries)
-        summary["total_execution_time_seconds"] = round(time.time() - total_start, 2)
+    if CAPTURE_PLANS:
+        plans = capture_query_plans()
+        summary["plan_regressions"] = plans["regressions"]
 
     # Write summary JSON
     with open(OUTPUT_DIR / "analytics_summary.json", "w") as f:
@@ -1,9 +1,27 @@
 import pandas as pd
-from datetime import datetime
+import sys
+from pathlib import Path
 from sqlalchemy import create_engine, text
 import os
+import yaml
 from dotenv import load_dotenv
 
+# Allow `python scripts/transformation/load_warehouse.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.ingestion.copy_loader import copy_dataframe_to_table
+from scripts.transformation.materialized_views import refresh_materialized_views
+from scripts.transformation.price_bands import price_band_sql
+from scripts.transformation.warehouse_layout import (
+    drop_covering_indexes,
+    ensure_covering_indexes,
+    ensure_fact_partitions,
+    is_partitioned,
+    partition_fact_sales
+)
+
 # ---------------------------------
 # Load environment variables
 # ---------------------------------
@@ -19,6 +37,20 @@ DB_URL = (
 
 engine = create_engine(DB_URL)
 
+with open(PROJECT_ROOT / "config" / "config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+# "full" deletes and rebuilds fact_sales; "incremental" only appends the
+# transactions fact_sales does not hold yet.
+FACT_LOAD = config.get("warehouse", {}).get("fact_load", "full")
+
+# "monthly" range-partitions fact_sales by date_key, converting a table
+# created before partitioning on the next load; "none" leaves it as is
+PARTITIONING = config.get("warehouse", {}).get("partitioning", "monthly")
+
+# Refresh the analytical materialized views once the load has committed
+REFRESH_VIEWS = config.get("analytics", {}).get("materialized_views", True)
+
 # ---------------------------------
 # DATE DIMENSION (FK-SAFE)
 # ---------------------------------
@@ -37,16 +69,18 @@ def build_dim_date(conn):
     df["is_weekend"] = df["day_name"].isin(["Saturday", "Sunday"])
     df["is_holiday"] = False
 
-    # FK-SAFE: use DELETE instead of TRUNCATE
-    conn.execute(text("DELETE FROM warehouse.dim_date"))
-
-    df.to_sql(
-        "dim_date",
-        conn,
-        schema="warehouse",
-        if_exists="append",
-        index=False
-    )
+    # FK-SAFE: existing dates stay put so retained facts keep their keys
+    conn.execute(text(
+        "CREATE TEMP TABLE incoming_dim_date "
+        "(LIKE warehouse.dim_date) ON COMMIT DROP"
+    ))
+    copy_dataframe_to_table(conn, df, "incoming_dim_date")
+    conn.execute(text("""
+        INSERT INTO warehouse.dim_date
+        SELECT * FROM incoming_dim_date
+        ON CONFLICT (date_key) DO NOTHING
+    """))
+    conn.execute(text("DROP TABLE incoming_dim_date"))
 
 # ---------------------------------
 # PAYMENT METHOD DIMENSION
@@ -60,87 +94,141 @@ def load_payment_methods(conn):
         ("Cash on Delivery", "Offline")
     ]
 
-    conn.execute(text("DELETE FROM warehouse.dim_payment_method"))
-
+    # Insert only missing methods so their surrogate keys stay stable
     conn.execute(
         text("""
             INSERT INTO warehouse.dim_payment_method
             (payment_method_name, payment_type)
-            VALUES (:name, :type)
+            SELECT CAST(:name AS VARCHAR), CAST(:type AS VARCHAR)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM warehouse.dim_payment_method
+                WHERE payment_method_name = :name
+            )
         """),
         [{"name": m[0], "type": m[1]} for m in methods]
     )
 
 # ---------------------------------
-# CUSTOMER DIMENSION (SCD TYPE 2)
+# SCD TYPE 2 (HASH-DIFF, SET-BASED)
 # ---------------------------------
-def load_dim_customers(conn):
-    customers = pd.read_sql("SELECT * FROM production.customers", conn)
+def apply_scd2(conn, dimension, key, source, attributes):
+    """
+    Bring warehouse.<dimension> in line with `source` inside PostgreSQL.
+    `attributes` maps dimension column -> SQL expression over the source
+    row. Current versions whose attribute hash differs from the source, or
+    whose key is no longer in the source, are expired, and a new current
+    version is inserted for changed and new keys only; unchanged rows are
+    left alone.
+    Returns (expired, inserted).
+    """
+    columns = list(attributes)
+    incoming = f"incoming_{dimension}"
 
-    # Expire existing records
-    conn.execute(text("""
-        UPDATE warehouse.dim_customers
+    def row_hash(alias):
+        return f"md5(ROW({', '.join(f'{alias}.{c}' for c in columns)})::text)"
+
+    conn.execute(text(f"""
+        CREATE TEMP TABLE {incoming} ON COMMIT DROP AS
+        SELECT {key}, {", ".join(f"{expr} AS {col}" for col, expr in attributes.items())}
+        FROM {source}
+    """))
+
+    expired = conn.execute(text(f"""
+        UPDATE warehouse.{dimension} d
         SET is_current = FALSE,
             end_date = CURRENT_DATE
-        WHERE is_current = TRUE
-    """))
+        FROM {incoming} s
+        WHERE d.{key} = s.{key}
+          AND d.is_current = TRUE
+          AND {row_hash("d")} IS DISTINCT FROM {row_hash("s")}
+    """)).rowcount
 
-    customers["full_name"] = customers["first_name"] + " " + customers["last_name"]
-    customers["customer_segment"] = "New"
-    customers["effective_date"] = datetime.today().date()
-    customers["end_date"] = None
-    customers["is_current"] = True
-
-    customers[[
-        "customer_id", "full_name", "email", "city", "state",
-        "country", "age_group", "customer_segment",
-        "registration_date", "effective_date", "end_date", "is_current"
-    ]].to_sql(
-        "dim_customers",
+    # Keys deleted upstream keep their history but stop being current
+    expired += conn.execute(text(f"""
+        UPDATE warehouse.{dimension} d
+        SET is_current = FALSE,
+            end_date = CURRENT_DATE
+        WHERE d.is_current = TRUE
+          AND NOT EXISTS (
+              SELECT 1 FROM {incoming} s
+              WHERE s.{key} = d.{key}
+          )
+    """)).rowcount
+
+    inserted = conn.execute(text(f"""
+        INSERT INTO warehouse.{dimension}
+            ({key}, {", ".join(columns)}, effective_date, end_date, is_current)
+        SELECT s.{key}, {", ".join(f"s.{c}" for c in columns)}, CURRENT_DATE, NULL, TRUE
+        FROM {incoming} s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM warehouse.{dimension} d
+            WHERE d.{key} = s.{key}
+              AND d.is_current = TRUE
+        )
+    """)).rowcount
+
+    conn.execute(text(f"DROP TABLE {incoming}"))
+    return expired, inserted
+
+
+# ---------------------------------
+# CUSTOMER DIMENSION (SCD TYPE 2)
+# ---------------------------------
+def load_dim_customers(conn):
+    expired, inserted = apply_scd2(
         conn,
-        schema="warehouse",
-        if_exists="append",
-        index=False
+        "dim_customers",
+        "customer_id",
+        "production.customers",
+        {
+            "full_name": "first_name || ' ' || last_name",
+            "email": "email",
+            "city": "city",
+            "state": "state",
+            "country": "country",
+            "age_group": "age_group",
+            "customer_segment": "CAST('New' AS VARCHAR(50))",
+            "registration_date": "registration_date"
+        }
     )
+    print(f"✅ dim_customers: {expired} expired, {inserted} new versions")
 
 # ---------------------------------
 # PRODUCT DIMENSION (SCD TYPE 2)
 # ---------------------------------
 def load_dim_products(conn):
-    products = pd.read_sql("SELECT * FROM production.products", conn)
-
-    conn.execute(text("""
-        UPDATE warehouse.dim_products
-        SET is_current = FALSE,
-            end_date = CURRENT_DATE
-        WHERE is_current = TRUE
-    """))
-
-    products["price_range"] = products["price"].apply(
-        lambda x: "Budget" if x < 50 else "Mid-range" if x < 200 else "Premium"
-    )
-
-    products["effective_date"] = datetime.today().date()
-    products["end_date"] = None
-    products["is_current"] = True
-
-    products[[
-        "product_id", "product_name", "category",
-        "sub_category", "brand", "price_range",
-        "effective_date", "end_date", "is_current"
-    ]].to_sql(
-        "dim_products",
+    expired, inserted = apply_scd2(
         conn,
-        schema="warehouse",
-        if_exists="append",
-        index=False
+        "dim_products",
+        "product_id",
+        "production.products",
+        {
+            "product_name": "product_name",
+            "category": "category",
+            "sub_category": "sub_category",
+            "brand": "brand",
+            "price_range": price_band_sql("price")
+        }
     )
+    print(f"✅ dim_products: {expired} expired, {inserted} new versions")
 
 # ---------------------------------
 # FACT SALES
 # ---------------------------------
-def load_fact_sales(conn):
-    sql = """
+def load_fact_sales(conn, incremental=False):
+    """
+    Insert fact rows for production transaction items. Incremental loads
+    anti-join on transaction_id, so only transactions not yet in
+    fact_sales are joined and inserted. Returns the rows inserted.
+    """
+    new_only = """
+    WHERE NOT EXISTS (
+        SELECT 1 FROM warehouse.fact_sales f
+        WHERE f.transaction_id = ti.transaction_id
+    )
+    """ if incremental else ""
+
+    sql = f"""
     INSERT INTO warehouse.fact_sales
     (
         date_key,
@@ -179,27 +267,106 @@ def load_fact_sales(conn):
     JOIN warehouse.dim_payment_method pm
         ON t.payment_method = pm.payment_method_name
     JOIN warehouse.dim_date d
-        ON d.full_date = t.transaction_date;
+        ON d.full_date = t.transaction_date
+    {new_only}
     """
 
-    conn.execute(text(sql))
+    return conn.execute(text(sql)).rowcount
 
 # ---------------------------------
 # AGGREGATES
 # ---------------------------------
-def build_aggregates(conn):
-    conn.execute(text("DELETE FROM warehouse.agg_daily_sales"))
-    conn.execute(text("""
-        INSERT INTO warehouse.agg_daily_sales
-        SELECT
-            date_key,
-            COUNT(DISTINCT transaction_id),
-            SUM(line_total),
-            SUM(profit),
-            COUNT(DISTINCT customer_key)
-        FROM warehouse.fact_sales
-        GROUP BY date_key
-    """))
+# Aggregate table -> grouping key and column -> expression over fact_sales f
+# (joined to dim_date d for calendar columns)
+AGGREGATES = {
+    "agg_daily_sales": {
+        "key": "date_key",
+        "columns": {
+            "total_transactions": "COUNT(DISTINCT f.transaction_id)",
+            "total_revenue": "SUM(f.line_total)",
+            "total_profit": "SUM(f.profit)",
+            "unique_customers": "COUNT(DISTINCT f.customer_key)"
+        }
+    },
+    "agg_product_performance": {
+        "key": "product_key",
+        "columns": {
+            "total_quantity_sold": "SUM(f.quantity)",
+            "total_revenue": "SUM(f.line_total)",
+            "total_profit": "SUM(f.profit)",
+            "avg_discount_percentage": (
+                "ROUND(AVG(f.discount_amount * 100 "
+                "/ NULLIF(f.unit_price * f.quantity, 0)), 2)"
+            )
+        }
+    },
+    "agg_customer_metrics": {
+        "key": "customer_key",
+        "columns": {
+            "total_transactions": "COUNT(DISTINCT f.transaction_id)",
+            "total_spent": "SUM(f.line_total)",
+            "avg_order_value": "ROUND(SUM(f.line_total) / COUNT(DISTINCT f.transaction_id), 2)",
+            "last_purchase_date": "MAX(d.full_date)"
+        }
+    }
+}
+
+
+def build_aggregates(conn, since_sales_key=None):
+    """
+    Upsert all aggregate tables from fact_sales. With `since_sales_key`,
+    only the date/product/customer keys touched by fact rows above that
+    sales_key are recomputed; otherwise every key is.
+    Returns rows written per table.
+    """
+    touched = ""
+    params = {}
+    if since_sales_key is not None:
+        params["since"] = since_sales_key
+
+    written = {}
+    for table, spec in AGGREGATES.items():
+        key = spec["key"]
+        columns = spec["columns"]
+        if since_sales_key is not None:
+            touched = f"""
+            WHERE f.{key} IN (
+                SELECT DISTINCT {key} FROM warehouse.fact_sales
+                WHERE sales_key > :since
+            )
+            """
+
+        written[table] = conn.execute(text(f"""
+            INSERT INTO warehouse.{table} ({key}, {", ".join(columns)})
+            SELECT f.{key}, {", ".join(columns.values())}
+            FROM warehouse.fact_sales f
+            JOIN warehouse.dim_date d ON d.date_key = f.date_key
+            {touched}
+            GROUP BY f.{key}
+            ON CONFLICT ({key}) DO UPDATE SET
+                {", ".join(f"{c} = EXCLUDED.{c}" for c in columns)}
+        """), params).rowcount
+    return written
+
+# ---------------------------------
+# INDEXES
+# ---------------------------------
+def ensure_warehouse_indexes(conn):
+    """Indexes the incremental loads rely on, for databases built before them."""
+    # Backs the fact load's anti-join on transaction_id
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_fact_transaction "
+        "ON warehouse.fact_sales (transaction_id)"
+    ))
+    # One current version per natural key; serves the SCD2 and fact joins
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_dim_customers_current "
+        "ON warehouse.dim_customers (customer_id) WHERE is_current"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_dim_products_current "
+        "ON warehouse.dim_products (product_id) WHERE is_current"
+    ))
 
 # ---------------------------------
 # MAIN LOAD FUNCTION
@@ -207,23 +374,60 @@ def build_aggregates(conn):
 def load_warehouse():
     print("🚀 Loading warehouse...")
 
+    incremental = FACT_LOAD == "incremental"
+
     with engine.begin() as conn:
 
-        # Clean fact & aggregates first (FK safe)
-        conn.execute(text("DELETE FROM warehouse.agg_customer_metrics"))
-        conn.execute(text("DELETE FROM warehouse.agg_product_performance"))
-        conn.execute(text("DELETE FROM warehouse.agg_daily_sales"))
-        conn.execute(text("DELETE FROM warehouse.fact_sales"))
+        if PARTITIONING == "monthly":
+            layout = partition_fact_sales(conn)
+            if layout["migrated"]:
+                print(f"✅ fact_sales partitioned by month: {layout}")
+
+        # Clean fact & aggregates first (FK safe); incremental runs keep
+        # both and maintain the aggregates for the keys new facts touch
+        if not incremental:
+            conn.execute(text("DELETE FROM warehouse.agg_customer_metrics"))
+            conn.execute(text("DELETE FROM warehouse.agg_product_performance"))
+            conn.execute(text("DELETE FROM warehouse.agg_daily_sales"))
+            conn.execute(text("DELETE FROM warehouse.fact_sales"))
+            # Rebuilt below once the facts are back in
+            drop_covering_indexes(conn)
+
+        ensure_warehouse_indexes(conn)
 
         # Load dimensions
         build_dim_date(conn)
+        if is_partitioned(conn):
+            partitions = ensure_fact_partitions(conn)
+            if partitions:
+                print(f"✅ fact_sales partitions created: {len(partitions)}")
         load_payment_methods(conn)
         load_dim_customers(conn)
         load_dim_products(conn)
 
         # Load fact & aggregates
-        load_fact_sales(conn)
-        build_aggregates(conn)
+        last_sales_key = conn.execute(
+            text("SELECT COALESCE(MAX(sales_key), 0) FROM warehouse.fact_sales")
+        ).scalar()
+        fact_rows = load_fact_sales(conn, incremental=incremental)
+        print(f"✅ Fact rows inserted ({FACT_LOAD}): {fact_rows}")
+
+        aggregates = build_aggregates(
+            conn, since_sales_key=last_sales_key if incremental else None
+        )
+        print(f"✅ Aggregates refreshed: {aggregates}")
+
+        # Full reloads dropped these before inserting the facts, since one
+        # build afterwards is cheaper than maintaining them row by row;
+        # incremental runs keep them and only create missing ones
+        created = ensure_covering_indexes(conn)
+        if created:
+            print(f"✅ Covering indexes created: {created}")
+
+    if REFRESH_VIEWS:
+        with engine.begin() as conn:
+            views = refresh_materialized_views(conn)
+        print(f"✅ Materialized views: {views}")
 
     print("🎉 Warehouse load completed successfully")
 
@@ -0,0 +1,165 @@
+import hashlib
+import re
+
+from sqlalchemy import text
+
+from scripts.transformation.analytical_queries import load_queries, render_sql
+
+# ---------------------------------------------------
+# Materialized Analytical Queries
+# ---------------------------------------------------
+# Every query in sql/queries/analytical_queries.sql becomes
+# warehouse.mv_qNN_<slug>. Rows carry a result_rank numbered by the query's
+# own ORDER BY keys (ties and unordered queries broken by the whole row,
+# so ranks are deterministic) with a unique index on it, which is what
+# REFRESH MATERIALIZED VIEW CONCURRENTLY requires. Parameterized queries
+# are materialized with their default parameters. mv_* views in the schema
+# that no registered query produces any more are dropped.
+VIEW_SCHEMA = "warehouse"
+
+# PostgreSQL truncates identifiers beyond 63 bytes
+MAX_IDENTIFIER = 63
+
+# ORDER BY items a view can number rows by: an output column and direction
+_ORDER_ITEM = re.compile(
+    r"^([A-Za-z_]\w*)((?:\s+(?:ASC|DESC))?(?:\s+NULLS\s+(?:FIRST|LAST))?)$", re.IGNORECASE
+)
+
+
+def view_name(query: dict) -> str:
+    return f"mv_q{query['number']:02d}_{query['slug']}"[:MAX_IDENTIFIER]
+
+
+def rank_index_name(name: str) -> str:
+    """Named after the view, so a renamed query never reuses an old index name."""
+    suffix = "_rank_idx"
+    return name[:MAX_IDENTIFIER - len(suffix)] + suffix
+
+
+def rank_order(query: dict) -> str:
+    """
+    Window ordering for result_rank: the query's ORDER BY keys, then the
+    whole row. An empty window would number rows in whatever order the
+    plan produces them, which parallel plans do not keep stable.
+    """
+    keys = []
+    for item in query.get("order_by", []):
+        match = _ORDER_ITEM.match(item)
+        if not match:
+            raise ValueError(
+                f"QUERY {query['number']}: materialized views need ORDER BY "
+                f"items that name output columns, got '{item}'"
+            )
+        keys.append(f'q."{match.group(1)}"{match.group(2)}')
+    return ", ".join(keys + ["q"])
+
+
+def view_definition(query: dict) -> str:
+    return (
+        f"SELECT ROW_NUMBER() OVER (ORDER BY {rank_order(query)}) AS result_rank, q.*\n"
+        f"FROM (\n{render_sql(query)}\n) q"
+    )
+
+
+def _definition_hash(definition: str) -> str:
+    return hashlib.md5(definition.encode("utf-8")).hexdigest()
+
+
+def _current_hash(conn, name: str):
+    return conn.execute(
+        text("""
+            SELECT obj_description(c.oid, 'pg_class')
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relname = :name AND c.relkind = 'm'
+        """),
+        {"schema": VIEW_SCHEMA, "name": name}
+    ).scalar()
+
+
+def _exists(conn, name: str) -> bool:
+    return conn.execute(
+        text("SELECT to_regclass(:qualified) IS NOT NULL"),
+        {"qualified": f"{VIEW_SCHEMA}.{name}"}
+    ).scalar()
+
+
+def drop_stale_views(conn, keep) -> list:
+    """Drop the schema's mv_* views whose names are not in `keep`."""
+    existing = conn.execute(
+        text("""
+            SELECT matviewname FROM pg_matviews
+            WHERE schemaname = :schema AND matviewname LIKE 'mv\\_%'
+            ORDER BY matviewname
+        """),
+        {"schema": VIEW_SCHEMA}
+    ).scalars().all()
+
+    stale = [name for name in existing if name not in keep]
+    for name in stale:
+        conn.execute(text(f"DROP MATERIALIZED VIEW {VIEW_SCHEMA}.{name}"))
+    return stale
+
+
+def ensure_materialized_views(conn, queries=None) -> dict:
+    """
+    Drop views of queries no longer registered, create missing views and
+    rebuild those whose query text changed (the definition hash is kept as
+    the view's comment). Returns
+    {view: "dropped" | "created" | "rebuilt" | "unchanged"}.
+    """
+    queries = queries or load_queries()
+    registered = {view_name(q) for q in load_queries()} | {view_name(q) for q in queries}
+    status = {name: "dropped" for name in drop_stale_views(conn, registered)}
+
+    for query in queries:
+        name = view_name(query)
+        qualified = f"{VIEW_SCHEMA}.{name}"
+        definition = view_definition(query)
+        definition_hash = _definition_hash(definition)
+
+        existing = _current_hash(conn, name)
+        if existing == definition_hash:
+            status[name] = "unchanged"
+            continue
+
+        if _exists(conn, name):
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {qualified}"))
+            status[name] = "rebuilt"
+        else:
+            status[name] = "created"
+
+        conn.execute(text(f"CREATE MATERIALIZED VIEW {qualified} AS\n{definition}\nWITH DATA"))
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX {rank_index_name(name)} ON {qualified} (result_rank)"
+        ))
+        conn.execute(text(f"COMMENT ON MATERIALIZED VIEW {qualified} IS '{definition_hash}'"))
+    return status
+
+
+def refresh_materialized_views(conn, queries=None) -> dict:
+    """
+    Refresh every analytical view without blocking readers. Views that
+    were just created are already current and are not refreshed again.
+    Returns {view: "dropped" | "created" | "rebuilt" | "refreshed"}.
+    """
+    status = ensure_materialized_views(conn, queries)
+    for name, state in status.items():
+        if state == "unchanged":
+            conn.execute(text(
+                f"REFRESH MATERIALIZED VIEW CONCURRENTLY {VIEW_SCHEMA}.{name}"
+            ))
+            status[name] = "refreshed"
+    return status
+
+
+def read_view_sql(query: dict, columns=None) -> str:
+    """
+    SELECT returning a view's rows in the query's original order, limited
+    to `columns` when given.
+    """
+    select_list = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+    return (
+        f"SELECT {select_list} FROM {VIEW_SCHEMA}.{view_name(query)} "
+        "ORDER BY result_rank"
+    )
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# ---------------------------------
+# Band Configuration
+# ---------------------------------
+# A price belongs to the first band whose threshold it is below; prices at
+# or above the last threshold fall in the final band.
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+with open(PROJECT_ROOT / "config" / "config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+DEFAULT_PRICE_BANDS = {
+    "thresholds": [50, 200],
+    "labels": ["Budget", "Mid-range", "Premium"]
+}
+
+PRICE_BANDS = config.get("transformation", {}).get("price_bands", DEFAULT_PRICE_BANDS)
+
+
+def validate_bands(thresholds, labels):
+    if len(labels) != len(thresholds) + 1:
+        raise ValueError("price_bands needs exactly one more label than thresholds")
+    if list(thresholds) != sorted(thresholds):
+        raise ValueError("price_bands thresholds must be ascending")
+
+
+# ---------------------------------
+# Classification
+# ---------------------------------
+def price_band(prices, bands: dict = None) -> pd.Categorical:
+    """
+    Classify prices into ordered band labels with one vectorized
+    searchsorted. Missing prices land in the top band, as the old
+    row-wise comparisons did.
+    """
+    bands = bands or PRICE_BANDS
+    thresholds, labels = bands["thresholds"], bands["labels"]
+    validate_bands(thresholds, labels)
+
+    values = np.asarray(prices, dtype="float64")
+    codes = np.searchsorted(np.asarray(thresholds, dtype="float64"), values, side="right")
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def price_band_sql(column: str, bands: dict = None) -> str:
+    """The same banding as a SQL CASE expression over `column`."""
+    bands = bands or PRICE_BANDS
+    thresholds, labels = bands["thresholds"], bands["labels"]
+    validate_bands(thresholds, labels)
+
+    def literal(label):
+        return "'" + str(label).replace("'", "''") + "'"
+
+    whens = " ".join(
+        f"WHEN {column} < {float(threshold)} THEN {literal(label)}"
+        for threshold, label in zip(thresholds, labels)
+    )
+    return f"CAST(CASE {whens} ELSE {literal(labels[-1])} END AS VARCHAR(50))"
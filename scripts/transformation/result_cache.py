@@ -0,0 +1,81 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+from scripts.ingestion.fingerprint_cache import table_checksum
+
+# ---------------------------------------------------
+# Analytics Result Cache
+# ---------------------------------------------------
+# Exported results are kept under data/cache/analytics/<version>/, where
+# the version fingerprints the warehouse contents. Any load that changes
+# the warehouse produces a new version, so stale results are never served
+# and older version directories are pruned on the next run.
+CACHE_DIR = Path("data/cache/analytics")
+
+# Tables the analytical queries read, with the columns left out of their
+# fingerprint. A full fact reload deletes and reinserts every row under
+# new sales_keys and created_at stamps, so those would change the version
+# on every pipeline run even when the data did not.
+VERSIONED_TABLES = {
+    "fact_sales": ("sales_key", "created_at"),
+    "dim_customers": (),
+    "dim_products": (),
+    "dim_date": (),
+    "dim_payment_method": ()
+}
+
+
+def warehouse_version(conn) -> str:
+    """Short hash of the content checksums of every table queries read."""
+    parts = [
+        f"{table}:{table_checksum(conn, 'warehouse', table, excluded)}"
+        for table, excluded in VERSIONED_TABLES.items()
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+# `exporter` names the output format and the code path that wrote it,
+# e.g. "csv/streaming", so toggling streaming never serves the other's file
+def query_hash(sql: str, exporter: str) -> str:
+    return hashlib.sha256(f"{exporter}\n{sql}".encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_paths(version: str, sql: str, exporter: str, extension: str):
+    entry = CACHE_DIR / version / query_hash(sql, exporter)
+    return entry.with_suffix(extension), entry.with_suffix(".json")
+
+
+def prune_cache(version: str) -> int:
+    """Remove cached results of every other warehouse version."""
+    if not CACHE_DIR.exists():
+        return 0
+    stale = [d for d in CACHE_DIR.iterdir() if d.is_dir() and d.name != version]
+    for directory in stale:
+        shutil.rmtree(directory, ignore_errors=True)
+    return len(stale)
+
+
+def restore_result(version, sql, exporter, extension, output_path: Path):
+    """
+    Copy a cached result to `output_path` and return its stored metadata,
+    or None when this query has not been cached for this version.
+    """
+    result_path, meta_path = _entry_paths(version, sql, exporter, extension)
+    if not (result_path.exists() and meta_path.exists()):
+        return None
+
+    shutil.copyfile(result_path, output_path)
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def store_result(version, sql, exporter, extension, output_path: Path, meta: dict):
+    result_path, meta_path = _entry_paths(version, sql, exporter, extension)
+    result_path.parent.mkdir(parents=True, exist_ok=True)
+
+    shutil.copyfile(output_path, result_path)
+    # Metadata last: an entry only counts once both files are in place
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=4)
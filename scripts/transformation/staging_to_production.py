@@ -1,11 +1,22 @@
 import pandas as pd
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 import os
+import yaml
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
+# Allow `python scripts/transformation/staging_to_production.py` from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.ingestion.copy_loader import copy_dataframe_to_table
+from scripts.transformation.price_bands import price_band
+from scripts.transformation.text_normalization import CUSTOMER_TEXT_RULES, normalize_text
+
 # ---------------------------------
 # Load environment variables
 # ---------------------------------
@@ -24,22 +35,48 @@ engine = create_engine(DB_URL)
 REPORT_DIR = Path("data/processed")
 REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
+with open("config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+# In incremental ingestion mode staging is a persistent mirror and only the
+# rows stamped by the latest ingestion run are read and merged downstream.
+INCREMENTAL = config.get("ingestion", {}).get("mode", "full") == "incremental"
+
+# "replace" truncates production and reloads it; "merge" upserts on the
+# natural keys and rewrites only rows whose content changed. An incremental
+# ingestion delta is always merged.
+LOAD_MODE = config.get("transformation", {}).get("load_mode", "replace")
+MERGE = INCREMENTAL or LOAD_MODE == "merge"
+
+# "pandas" pulls staging into DataFrames; "streaming" does the same in
+# batch_size chunks read through a server-side cursor; "sql" runs the same
+# cleaning as INSERT … SELECT statements so rows never leave PostgreSQL.
+EXECUTION = config.get("transformation", {}).get("execution", "pandas")
+BATCH_SIZE = config.get("pipeline", {}).get("batch_size", 1000)
+
+# Rows of staging.<table> changed since this stage last consumed it. The
+# consumer mark is advanced by staging_to_production itself, in the same
+# transaction as the production writes, so repeated ingestion runs cannot
+# move changed rows out of the window before they reach production.
+DELTA_FILTER = """
+    s.loaded_at > COALESCE(
+        (SELECT consumed_high_water_mark
+         FROM staging.ingestion_state
+         WHERE table_name = :table),
+        '-infinity'::timestamp
+    )
+"""
+
 # ---------------------------------
 # Helper Functions
 # ---------------------------------
 def clean_text(df):
-    for col in df.select_dtypes(include="object").columns:
-        df[col] = df[col].astype(str).str.strip()
-    return df
+    return normalize_text(df)
 
 
 def standardize_customers(df):
-    df = clean_text(df)
-    df["email"] = df["email"].str.lower()
-    df["first_name"] = df["first_name"].str.title()
-    df["last_name"] = df["last_name"].str.title()
-    df["phone"] = df["phone"].str.replace(r"\D", "", regex=True)
-    return df
+    # Trim, lower/title-case and phone digits in one Arrow pass per column
+    return normalize_text(df, CUSTOMER_TEXT_RULES)
 
 
 def enrich_products(df):
@@ -52,12 +89,385 @@ def enrich_products(df):
         ((df["price"] - df["cost"]) / df["price"]) * 100, 2
     )
 
-    df["price_category"] = df["price"].apply(
-        lambda x: "Budget" if x < 50 else "Mid-range" if x < 200 else "Premium"
-    )
+    df["price_category"] = price_band(df["price"])
     return df
 
 
+# Table transforms: cleaned frame in, rows to load out. Each returns
+# (rows_to_load, rejected_count) so streaming runs can sum per chunk.
+def transform_customers(df):
+    return standardize_customers(df), 0
+
+
+def transform_products(df):
+    products = enrich_products(df)
+    products = products[products["price"] > 0]
+
+    # Drop derived columns before loading to production
+    products_to_load = products.drop(
+        columns=["profit_margin", "price_category"],
+        errors="ignore"
+    )
+    return products_to_load, len(df) - len(products_to_load)
+
+
+def transform_transactions(df):
+    transactions = df[df["total_amount"] > 0]
+    return transactions, len(df) - len(transactions)
+
+
+def transform_transaction_items(df):
+    items = df[df["quantity"] > 0].copy()
+
+    items["line_total"] = round(
+        items["quantity"]
+        * items["unit_price"]
+        * (1 - items["discount_percentage"] / 100),
+        2
+    )
+    return items, len(df) - len(items)
+
+
+# table -> (natural key, transform, rejected-reason key)
+PANDAS_TRANSFORMS = {
+    "customers": ("customer_id", transform_customers, None),
+    "products": ("product_id", transform_products, "invalid_price"),
+    "transactions": ("transaction_id", transform_transactions, "total_amount_le_zero"),
+    "transaction_items": ("item_id", transform_transaction_items, "invalid_quantity")
+}
+
+
+# ---------------------------------
+# Staging Reads / Production Writes
+# ---------------------------------
+def staging_query(table):
+    if not INCREMENTAL:
+        return text(f"SELECT * FROM staging.{table}"), {}
+    return (
+        text(f"SELECT s.* FROM staging.{table} s WHERE {DELTA_FILTER}"),
+        {"table": table}
+    )
+
+
+def ingestion_marks(conn):
+    """Current ingestion high-water mark per staging table."""
+    return dict(conn.execute(text(
+        "SELECT table_name, high_water_mark FROM staging.ingestion_state"
+    )).all())
+
+
+def advance_consumed_marks(conn, marks):
+    """
+    Record that everything up to `marks` (read before transforming) has
+    reached production. Rows ingested while this run was going stay above
+    the mark and are picked up next time; merging them twice is harmless.
+    """
+    for table, mark in marks.items():
+        conn.execute(
+            text("""
+                UPDATE staging.ingestion_state
+                SET consumed_high_water_mark = :mark
+                WHERE table_name = :table
+            """),
+            {"table": table, "mark": mark}
+        )
+
+
+def read_staging(conn, table):
+    query, params = staging_query(table)
+    return pd.read_sql(query, conn, params=params)
+
+
+def iter_staging_chunks(conn, table, batch_size):
+    """
+    Yield staging.<table> as DataFrames of at most `batch_size` rows,
+    fetched through a server-side cursor so only one chunk is in memory.
+    """
+    query, params = staging_query(table)
+    result = conn.execute(
+        query.execution_options(stream_results=True, max_row_buffer=batch_size),
+        params
+    )
+    columns = list(result.keys())
+    for rows in result.partitions(batch_size):
+        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def merge_rows(conn, table, key, columns, source_sql, params=None):
+    """
+    Upsert the rows selected by `source_sql` (one value per column, in
+    order) into production.<table>. Existing rows are rewritten only when
+    the md5 of their content differs from the incoming row's.
+    Returns inserted/updated/unchanged counts.
+    """
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != key)
+    current_hash = f"md5(ROW({', '.join(f'p.{c}' for c in columns)})::text)"
+    incoming_hash = f"md5(ROW({', '.join(f'EXCLUDED.{c}' for c in columns)})::text)"
+
+    offered, inserted, updated = conn.execute(
+        text(f"""
+            WITH source AS (
+                {source_sql}
+            ),
+            merged AS (
+                INSERT INTO production.{table} AS p ({column_list})
+                SELECT * FROM source
+                ON CONFLICT ({key}) DO UPDATE SET
+                    {updates},
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE {current_hash} IS DISTINCT FROM {incoming_hash}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                (SELECT COUNT(*) FROM source),
+                COUNT(*) FILTER (WHERE inserted),
+                COUNT(*) FILTER (WHERE NOT inserted)
+            FROM merged
+        """),
+        params or {}
+    ).one()
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": offered - inserted - updated
+    }
+
+
+def merge_into_production(conn, df, table, key):
+    """Upsert `df` into production.<table> keyed on its natural ID."""
+    incoming = f"incoming_{table}"
+    columns = list(df.columns)
+
+    conn.execute(text(
+        f"CREATE TEMP TABLE {incoming} "
+        f"(LIKE production.{table} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    copy_dataframe_to_table(conn, df, incoming)
+
+    counts = merge_rows(
+        conn, table, key, columns,
+        f"SELECT {', '.join(columns)} FROM {incoming}"
+    )
+    conn.execute(text(f"DROP TABLE {incoming}"))
+    return counts
+
+
+def write_production(conn, df, table, key):
+    """Write transformed rows; returns merge counts in merge mode, else None."""
+    if MERGE:
+        return merge_into_production(conn, df, table, key)
+
+    df.to_sql(
+        table,
+        conn,
+        schema="production",
+        if_exists="append",
+        index=False
+    )
+
+
+def write_production_chunk(conn, df, table, key):
+    """Bulk-load one streamed chunk with COPY (merged in incremental mode)."""
+    if MERGE:
+        return merge_into_production(conn, df, table, key)
+
+    copy_dataframe_to_table(conn, df, f"production.{table}")
+
+
+# ---------------------------------
+# In-Memory Execution
+# ---------------------------------
+def transform_table_in_pandas(conn, table, streaming=False):
+    """
+    Run one table's pandas transform, either on the whole staging table or
+    chunk by chunk (pipeline.batch_size rows) when streaming.
+    Returns the records_processed entry for the summary.
+    """
+    key, transform, rejected_reason = PANDAS_TRANSFORMS[table]
+
+    if streaming:
+        chunks = iter_staging_chunks(conn, table, BATCH_SIZE)
+        write = write_production_chunk
+    else:
+        chunks = [read_staging(conn, table)]
+        write = write_production
+
+    input_count = output_count = rejected = 0
+    merged = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for chunk in chunks:
+        input_count += len(chunk)
+        chunk = chunk.drop(columns=["loaded_at"], errors="ignore")
+        rows, chunk_rejected = transform(chunk)
+        if len(rows):
+            counts = write(conn, rows, table, key)
+            for name, count in (counts or {}).items():
+                merged[name] += count
+        output_count += len(rows)
+        rejected += chunk_rejected
+
+    entry = {
+        "input": input_count,
+        "output": output_count,
+        "filtered": rejected,
+        "rejected_reasons": (
+            {rejected_reason: int(rejected)} if rejected_reason else {}
+        )
+    }
+    if MERGE:
+        entry["merge"] = merged
+    return entry
+
+
+def transform_in_pandas(conn, summary, streaming=False):
+    """Clean each staging table in pandas and write it to production."""
+    if not MERGE:
+        conn.execute(text("TRUNCATE production.customers, production.products CASCADE"))
+
+    for table in PANDAS_TRANSFORMS:
+        label = table.replace("_", " ")
+        print(f"🔄 Loading {label}...")
+        summary["records_processed"][table] = transform_table_in_pandas(
+            conn, table, streaming=streaming
+        )
+        print(f"✅ {label.capitalize()} loaded: "
+              f"{summary['records_processed'][table]['output']}")
+
+
+# ---------------------------------
+# In-Database Execution
+# ---------------------------------
+# Per table: production column -> SQL expression over staging row `s`, the
+# row filter and the rejected-reason key reported for filtered rows. These
+# mirror the pandas helpers above.
+SQL_TRANSFORMS = {
+    "customers": {
+        "key": "customer_id",
+        "columns": {
+            "customer_id": "TRIM(s.customer_id)",
+            "first_name": "INITCAP(TRIM(s.first_name))",
+            "last_name": "INITCAP(TRIM(s.last_name))",
+            "email": "LOWER(TRIM(s.email))",
+            "phone": "regexp_replace(s.phone, '\\D', '', 'g')",
+            "registration_date": "s.registration_date",
+            "city": "TRIM(s.city)",
+            "state": "TRIM(s.state)",
+            "country": "TRIM(s.country)",
+            "age_group": "TRIM(s.age_group)"
+        },
+        "filter": None,
+        "rejected_reason": None
+    },
+    "products": {
+        "key": "product_id",
+        "columns": {
+            "product_id": "TRIM(s.product_id)",
+            "product_name": "TRIM(s.product_name)",
+            "category": "TRIM(s.category)",
+            "sub_category": "TRIM(s.sub_category)",
+            "price": "ROUND(s.price, 2)",
+            "cost": "ROUND(s.cost, 2)",
+            "brand": "TRIM(s.brand)",
+            "stock_quantity": "s.stock_quantity",
+            "supplier_id": "TRIM(s.supplier_id)"
+        },
+        "filter": "s.price > 0",
+        "rejected_reason": "invalid_price"
+    },
+    "transactions": {
+        "key": "transaction_id",
+        "columns": {
+            "transaction_id": "TRIM(s.transaction_id)",
+            "customer_id": "TRIM(s.customer_id)",
+            "transaction_date": "s.transaction_date",
+            "transaction_time": "s.transaction_time",
+            "payment_method": "TRIM(s.payment_method)",
+            "shipping_address": "TRIM(s.shipping_address)",
+            "total_amount": "s.total_amount"
+        },
+        "filter": "s.total_amount > 0",
+        "rejected_reason": "total_amount_le_zero"
+    },
+    "transaction_items": {
+        "key": "item_id",
+        "columns": {
+            "item_id": "TRIM(s.item_id)",
+            "transaction_id": "TRIM(s.transaction_id)",
+            "product_id": "TRIM(s.product_id)",
+            "quantity": "s.quantity",
+            "unit_price": "s.unit_price",
+            "discount_percentage": "s.discount_percentage",
+            "line_total": (
+                "ROUND(s.quantity * s.unit_price"
+                " * (1 - s.discount_percentage / 100), 2)"
+            )
+        },
+        "filter": "s.quantity > 0",
+        "rejected_reason": "invalid_quantity"
+    }
+}
+
+
+def transform_table_in_database(conn, table):
+    """
+    INSERT … SELECT one staging table into production. Incremental runs
+    read only the latest delta; merge mode upserts on the natural key.
+    Returns the records_processed entry for the summary.
+    """
+    spec = SQL_TRANSFORMS[table]
+    columns = list(spec["columns"])
+    conditions = [c for c in (spec["filter"], DELTA_FILTER if INCREMENTAL else None) if c]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params = {"table": table} if INCREMENTAL else {}
+    select = (
+        f"SELECT {', '.join(spec['columns'].values())} "
+        f"FROM staging.{table} s {where}"
+    )
+
+    input_count = conn.execute(
+        text(f"SELECT COUNT(*) FROM staging.{table} s "
+             f"{'WHERE ' + DELTA_FILTER if INCREMENTAL else ''}"),
+        params
+    ).scalar()
+
+    merged = None
+    if MERGE:
+        merged = merge_rows(conn, table, spec["key"], columns, select, params)
+        output_count = sum(merged.values())
+    else:
+        output_count = conn.execute(
+            text(f"INSERT INTO production.{table} ({', '.join(columns)}) {select}"),
+            params
+        ).rowcount
+
+    filtered = input_count - output_count
+    entry = {
+        "input": input_count,
+        "output": output_count,
+        "filtered": filtered,
+        "rejected_reasons": (
+            {spec["rejected_reason"]: filtered} if spec["rejected_reason"] else {}
+        )
+    }
+    if merged is not None:
+        entry["merge"] = merged
+    return entry
+
+
+def transform_in_database(conn, summary):
+    """Run every staging → production transform inside PostgreSQL."""
+    if not MERGE:
+        conn.execute(text("TRUNCATE production.customers, production.products CASCADE"))
+
+    for table in SQL_TRANSFORMS:
+        label = table.replace("_", " ")
+        print(f"🔄 Loading {label} (in-database)...")
+        summary["records_processed"][table] = transform_table_in_database(conn, table)
+        print(f"✅ {label.capitalize()} loaded: "
+              f"{summary['records_processed'][table]['output']}")
+
+
 # ---------------------------------
 # Main ETL Logic
 # ---------------------------------
@@ -66,6 +476,8 @@ def staging_to_production():
 
     summary = {
         "transformation_timestamp": datetime.utcnow().isoformat(),
+        "load_mode": "incremental" if INCREMENTAL else "merge" if MERGE else "full",
+        "execution": EXECUTION,
         "records_processed": {},
         "transformations_applied": [
             "text_trim",
@@ -81,131 +493,15 @@ def staging_to_production():
     }
 
     with engine.begin() as conn:
-        # =============================
-        # CUSTOMERS (DIMENSION)
-        # =============================
-        print("🔄 Loading customers...")
-        customers = pd.read_sql("SELECT * FROM staging.customers", conn)
-        input_count = len(customers)
-
-        customers = customers.drop(columns=["loaded_at"], errors="ignore")
-        customers = standardize_customers(customers)
-
-        conn.execute(text("TRUNCATE production.customers CASCADE"))
-        customers.to_sql(
-            "customers",
-            conn,
-            schema="production",
-            if_exists="append",
-            index=False
-        )
+        marks = ingestion_marks(conn) if INCREMENTAL else {}
 
-        summary["records_processed"]["customers"] = {
-            "input": input_count,
-            "output": len(customers),
-            "filtered": 0,
-            "rejected_reasons": {}
-        }
-        print(f"✅ Customers loaded: {len(customers)}")
-
-        # =============================
-        # PRODUCTS (DIMENSION)
-        # =============================
-        print("🔄 Loading products...")
-        products = pd.read_sql("SELECT * FROM staging.products", conn)
-        input_count = len(products)
-
-        products = products.drop(columns=["loaded_at"], errors="ignore")
-        products = enrich_products(products)
-        products = products[products["price"] > 0]
-
-        # Drop derived columns before loading to production
-        products_to_load = products.drop(
-            columns=["profit_margin", "price_category"],
-            errors="ignore"
-        )
+        if EXECUTION == "sql":
+            transform_in_database(conn, summary)
+        else:
+            transform_in_pandas(conn, summary, streaming=EXECUTION == "streaming")
 
-        conn.execute(text("TRUNCATE production.products CASCADE"))
-        products_to_load.to_sql(
-            "products",
-            conn,
-            schema="production",
-            if_exists="append",
-            index=False
-        )
-
-        summary["records_processed"]["products"] = {
-            "input": input_count,
-            "output": len(products_to_load),
-            "filtered": input_count - len(products_to_load),
-            "rejected_reasons": {
-                "invalid_price": int(input_count - len(products_to_load))
-            }
-        }
-        print(f"✅ Products loaded: {len(products_to_load)}")
-
-        # =============================
-        # TRANSACTIONS (FACT – APPEND)
-        # =============================
-        print("🔄 Loading transactions...")
-        transactions = pd.read_sql("SELECT * FROM staging.transactions", conn)
-        input_count = len(transactions)
-
-        transactions = transactions.drop(columns=["loaded_at"], errors="ignore")
-        transactions = transactions[transactions["total_amount"] > 0]
-
-        transactions.to_sql(
-            "transactions",
-            conn,
-            schema="production",
-            if_exists="append",
-            index=False
-        )
-
-        summary["records_processed"]["transactions"] = {
-            "input": input_count,
-            "output": len(transactions),
-            "filtered": input_count - len(transactions),
-            "rejected_reasons": {
-                "total_amount_le_zero": int(input_count - len(transactions))
-            }
-        }
-        print(f"✅ Transactions loaded: {len(transactions)}")
-
-        # =============================
-        # TRANSACTION ITEMS (FACT – APPEND)
-        # =============================
-        print("🔄 Loading transaction items...")
-        items = pd.read_sql("SELECT * FROM staging.transaction_items", conn)
-        input_count = len(items)
-
-        items = items.drop(columns=["loaded_at"], errors="ignore")
-        items = items[items["quantity"] > 0]
-
-        items["line_total"] = round(
-            items["quantity"]
-            * items["unit_price"]
-            * (1 - items["discount_percentage"] / 100),
-            2
-        )
-
-        items.to_sql(
-            "transaction_items",
-            conn,
-            schema="production",
-            if_exists="append",
-            index=False
-        )
-
-        summary["records_processed"]["transaction_items"] = {
-            "input": input_count,
-            "output": len(items),
-            "filtered": input_count - len(items),
-            "rejected_reasons": {
-                "invalid_quantity": int(input_count - len(items))
-            }
-        }
-        print(f"✅ Transaction items loaded: {len(items)}")
+        # Commits together with the production writes, or not at all
+        advance_consumed_marks(conn, marks)
 
     # =============================
     # Write Summary
@@ -0,0 +1,51 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# -----------------------------
+# Normalization Rules
+# -----------------------------
+# Each rule is a chain of Arrow compute kernels applied to a whole column
+# in one go. Nulls pass through every kernel untouched.
+TEXT_RULES = {
+    "strip": lambda a: pc.utf8_trim_whitespace(a),
+    "lower": lambda a: pc.utf8_lower(pc.utf8_trim_whitespace(a)),
+    "title": lambda a: pc.utf8_title(pc.utf8_trim_whitespace(a)),
+    # Dropping every non-digit also removes surrounding whitespace
+    "digits": lambda a: pc.replace_substring_regex(a, r"\D", "")
+}
+
+CUSTOMER_TEXT_RULES = {
+    "email": "lower",
+    "first_name": "title",
+    "last_name": "title",
+    "phone": "digits"
+}
+
+
+def _as_arrow_strings(column: pd.Series):
+    """Arrow string array for a text column, or None for non-text columns."""
+    if not (column.dtype == object or pd.api.types.is_string_dtype(column.dtype)):
+        return None
+    try:
+        array = pa.array(column, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    return array if pa.types.is_string(array.type) else None
+
+
+def normalize_text(df: pd.DataFrame, rules: dict = None) -> pd.DataFrame:
+    """
+    Normalize every text column of `df` in place: trim by default, or the
+    rule named in `rules` (column -> rule). Columns come back as
+    string[pyarrow] with nulls preserved; non-text object columns such as
+    dates are left as they are.
+    """
+    rules = rules or {}
+    for col in df.columns:
+        array = _as_arrow_strings(df[col])
+        if array is None:
+            continue
+        result = TEXT_RULES[rules.get(col, "strip")](array)
+        df[col] = pd.Series(pd.arrays.ArrowStringArray(result), index=df.index)
+    return df
@@ -0,0 +1,244 @@
+import re
+
+from sqlalchemy import text
+
+from scripts.transformation.analytical_queries import load_queries
+
+# ---------------------------------------------------
+# fact_sales Layout
+# ---------------------------------------------------
+# fact_sales is range-partitioned on date_key (YYYYMMDD) with one
+# partition per calendar month plus a DEFAULT partition that catches
+# anything outside them. Scans filtered on date_key only touch the
+# months they need, and each month's indexes stay small.
+FACT_TABLE = "warehouse.fact_sales"
+DEFAULT_PARTITION = "fact_sales_default"
+
+# Never useful as index keys or covering columns
+NON_INDEX_COLUMNS = {"sales_key", "created_at"}
+
+_SQL_KEYWORDS = {"JOIN", "WHERE", "GROUP", "ORDER", "LIMIT", "INNER", "LEFT", "ON"}
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"fact_sales_{year}_{month:02d}"
+
+
+def month_bounds(year: int, month: int) -> tuple:
+    """date_key range [start, end) of one calendar month."""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return year * 10000 + month * 100 + 1, next_year * 10000 + next_month * 100 + 1
+
+
+def is_partitioned(conn) -> bool:
+    return conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": FACT_TABLE}
+    ).scalar() is True
+
+
+def existing_partitions(conn) -> set:
+    return set(conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+    """), {"table": FACT_TABLE}).scalars())
+
+
+def ensure_fact_partitions(conn) -> list:
+    """
+    Create the monthly partitions for every month in dim_date that does
+    not have one yet. Rows already parked in the DEFAULT partition for
+    those months are moved into them. Returns the partitions created.
+    """
+    existing = existing_partitions(conn)
+    months = conn.execute(text(
+        "SELECT DISTINCT year, month FROM warehouse.dim_date ORDER BY year, month"
+    )).all()
+    missing = [(y, m) for y, m in months if partition_name(y, m) not in existing]
+    if not missing:
+        return []
+
+    if DEFAULT_PARTITION not in existing:
+        conn.execute(text(
+            f"CREATE TABLE warehouse.{DEFAULT_PARTITION} PARTITION OF {FACT_TABLE} DEFAULT"
+        ))
+
+    # A new partition cannot be attached while DEFAULT holds rows in its range
+    conn.execute(text(
+        f"CREATE TEMP TABLE parked_fact_sales (LIKE {FACT_TABLE}) ON COMMIT DROP"
+    ))
+    conn.execute(text(f"""
+        WITH moved AS (DELETE FROM warehouse.{DEFAULT_PARTITION} RETURNING *)
+        INSERT INTO parked_fact_sales SELECT * FROM moved
+    """))
+
+    for year, month in missing:
+        start, end = month_bounds(year, month)
+        conn.execute(text(
+            f"CREATE TABLE warehouse.{partition_name(year, month)} "
+            f"PARTITION OF {FACT_TABLE} FOR VALUES FROM ({start}) TO ({end})"
+        ))
+
+    conn.execute(text(f"INSERT INTO {FACT_TABLE} SELECT * FROM parked_fact_sales"))
+    conn.execute(text("DROP TABLE parked_fact_sales"))
+    return [partition_name(y, m) for y, m in missing]
+
+
+def partition_fact_sales(conn) -> dict:
+    """
+    Convert a plain fact_sales table into the monthly partitioned layout,
+    keeping every row, its sales_key and the key sequence. The analytical
+    materialized views depend on the old table and are dropped with it;
+    the next view refresh recreates them. Returns what was done.
+    """
+    if is_partitioned(conn):
+        return {"migrated": False}
+
+    old = "warehouse.fact_sales_unpartitioned"
+    conn.execute(text(f"ALTER TABLE {FACT_TABLE} RENAME TO fact_sales_unpartitioned"))
+    # Index names are unique per schema; free them for the new table, and
+    # drop the old foreign keys so the new ones keep their usual names
+    conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT fact_sales_pkey TO fact_sales_unpartitioned_pkey"))
+    foreign_keys = list(conn.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:old) AND contype = 'f'"
+    ), {"old": old}).scalars())
+    for constraint in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {old} DROP CONSTRAINT {constraint}"))
+    indexes = list(conn.execute(text("""
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = 'warehouse' AND tablename = 'fact_sales_unpartitioned'
+          AND indexname <> 'fact_sales_unpartitioned_pkey'
+    """)).scalars())
+    for index in indexes:
+        conn.execute(text(f"DROP INDEX warehouse.{index}"))
+
+    # LIKE keeps the column order and the sales_key sequence default
+    conn.execute(text(f"""
+        CREATE TABLE {FACT_TABLE} (
+            LIKE {old} INCLUDING DEFAULTS,
+            PRIMARY KEY (sales_key, date_key),
+            FOREIGN KEY (date_key) REFERENCES warehouse.dim_date (date_key),
+            FOREIGN KEY (customer_key) REFERENCES warehouse.dim_customers (customer_key),
+            FOREIGN KEY (product_key) REFERENCES warehouse.dim_products (product_key),
+            FOREIGN KEY (payment_method_key) REFERENCES warehouse.dim_payment_method (payment_method_key)
+        ) PARTITION BY RANGE (date_key)
+    """))
+    conn.execute(text(
+        "ALTER SEQUENCE warehouse.fact_sales_sales_key_seq OWNED BY warehouse.fact_sales.sales_key"
+    ))
+
+    partitions = ensure_fact_partitions(conn)
+    rows = conn.execute(text(f"INSERT INTO {FACT_TABLE} SELECT * FROM {old}")).rowcount
+
+    dropped_views = list(conn.execute(text("""
+        SELECT DISTINCT v.relname
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class v ON v.oid = r.ev_class
+        WHERE d.refobjid = to_regclass(:old) AND v.relkind = 'm'
+    """), {"old": old}).scalars())
+    conn.execute(text(f"DROP TABLE {old} CASCADE"))
+
+    return {
+        "migrated": True,
+        "rows": rows,
+        "partitions": len(partitions),
+        "dropped_views": sorted(dropped_views)
+    }
+
+
+# ---------------------------------------------------
+# Covering Indexes From The Query Registry
+# ---------------------------------------------------
+def fact_columns(conn) -> list:
+    return list(conn.execute(text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'warehouse' AND table_name = 'fact_sales'
+        ORDER BY ordinal_position
+    """)).scalars())
+
+
+def _fact_alias(sql: str):
+    match = re.search(r"warehouse\.fact_sales(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE)
+    alias = match.group(1) if match else None
+    return None if alias is None or alias.upper() in _SQL_KEYWORDS else alias
+
+
+def query_fact_usage(sql: str, columns: list):
+    """
+    (key columns, other columns) of fact_sales a query uses. Keys are the
+    columns it joins or groups on; the rest are what it reads per row.
+    Returns None for queries that do not read fact_sales.
+    """
+    if not re.search(r"warehouse\.fact_sales\b", sql, re.IGNORECASE):
+        return None
+
+    candidates = [c for c in columns if c not in NON_INDEX_COLUMNS]
+    alias = _fact_alias(sql)
+    prefix = rf"\b{alias}\." if alias else r"(?<![\w.])"
+
+    def referenced(fragment):
+        return [c for c in candidates if re.search(rf"{prefix}{c}\b", fragment)]
+
+    joins = " ".join(re.findall(r"\bON\s+(.+?)(?=\bJOIN\b|\bWHERE\b|\bGROUP\b|\)|$)", sql, re.DOTALL | re.IGNORECASE))
+    groups = " ".join(re.findall(r"\bGROUP\s+BY\s+(.+?)(?=\bORDER\b|\bLIMIT\b|\bHAVING\b|\)|$)", sql, re.DOTALL | re.IGNORECASE))
+    keys = referenced(joins + " " + groups)
+    others = [c for c in referenced(sql) if c not in keys]
+    return keys, others
+
+
+def covering_index_name(keys) -> str:
+    return "idx_fact_" + "_".join(k[:-4] if k.endswith("_key") else k for k in keys) + "_covering"
+
+
+def derive_fact_indexes(queries: list, columns: list) -> dict:
+    """
+    One covering index per distinct set of fact keys the registered
+    queries join or group on, INCLUDE-ing every fact column those queries
+    read, so they can be answered from the index alone.
+    Returns {index name: {"keys": [...], "include": [...], "queries": [...]}}.
+    """
+    indexes = {}
+    for query in queries:
+        usage = query_fact_usage(query["sql"], columns)
+        if not usage or not usage[0]:
+            continue
+        keys, others = usage
+        entry = indexes.setdefault(covering_index_name(keys), {"keys": keys, "include": [], "queries": []})
+        entry["include"] = [c for c in columns if c in set(entry["include"]) | set(others)]
+        entry["queries"].append(f"query{query['number']}")
+    return indexes
+
+
+def ensure_covering_indexes(conn, queries=None) -> list:
+    """Create the registry-derived covering indexes missing from fact_sales."""
+    indexes = derive_fact_indexes(queries or load_queries(), fact_columns(conn))
+    created = []
+    for name, spec in indexes.items():
+        exists = conn.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"warehouse.{name}"}
+        ).scalar()
+        if exists:
+            continue
+        include = f" INCLUDE ({', '.join(spec['include'])})" if spec["include"] else ""
+        conn.execute(text(
+            f"CREATE INDEX {name} ON {FACT_TABLE} ({', '.join(spec['keys'])}){include}"
+        ))
+        created.append(name)
+    return created
+
+
+def drop_covering_indexes(conn, queries=None) -> list:
+    """Drop the registry-derived covering indexes present on fact_sales."""
+    indexes = derive_fact_indexes(queries or load_queries(), fact_columns(conn))
+    dropped = []
+    for name in indexes:
+        exists = conn.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"warehouse.{name}"}
+        ).scalar()
+        if exists:
+            conn.execute(text(f"DROP INDEX warehouse.{name}"))
+            dropped.append(name)
+    return dropped
@@ -66,4 +66,20 @@ CREATE TABLE IF NOT EXISTS staging.transaction_items (
     discount_percentage DECIMAL(5, 2),
     line_total DECIMAL(12, 2),
     loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ===============================
+-- STAGING: INCREMENTAL INGESTION STATE
+-- ===============================
+-- One row per staging table: checksum of the last raw file merged, the
+-- loaded_at high-water marks written by ingestion and the mark up to which
+-- staging_to_production has consumed the table.
+CREATE TABLE IF NOT EXISTS staging.ingestion_state (
+    table_name VARCHAR(50) PRIMARY KEY,
+    file_checksum VARCHAR(64),
+    high_water_mark TIMESTAMP,
+    previous_high_water_mark TIMESTAMP,
+    consumed_high_water_mark TIMESTAMP,
+    rows_changed INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
\ No newline at end of file
@@ -67,8 +67,12 @@ CREATE TABLE IF NOT EXISTS warehouse.dim_payment_method (
 -- ===============================
 -- FACT SALES
 -- ===============================
+-- Range-partitioned by date_key, one partition per month. Monthly
+-- partitions are created by the warehouse load from dim_date
+-- (scripts/transformation/warehouse_layout.py); the DEFAULT partition
+-- only catches dates no monthly partition covers yet.
 CREATE TABLE IF NOT EXISTS warehouse.fact_sales (
-    sales_key BIGSERIAL PRIMARY KEY,
+    sales_key BIGSERIAL,
     date_key INTEGER NOT NULL,
     customer_key INTEGER NOT NULL,
     product_key INTEGER NOT NULL,
@@ -80,11 +84,14 @@ CREATE TABLE IF NOT EXISTS warehouse.fact_sales (
     line_total DECIMAL(12, 2),
     profit DECIMAL(12, 2),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (sales_key, date_key),
     FOREIGN KEY (date_key) REFERENCES warehouse.dim_date (date_key),
     FOREIGN KEY (customer_key) REFERENCES warehouse.dim_customers (customer_key),
     FOREIGN KEY (product_key) REFERENCES warehouse.dim_products (product_key),
     FOREIGN KEY (payment_method_key) REFERENCES warehouse.dim_payment_method (payment_method_key)
-);
+) PARTITION BY RANGE (date_key);
+
+CREATE TABLE IF NOT EXISTS warehouse.fact_sales_default PARTITION OF warehouse.fact_sales DEFAULT;
 
 -- ===============================
 -- AGGREGATE TABLES
@@ -116,10 +123,11 @@ CREATE TABLE IF NOT EXISTS warehouse.agg_customer_metrics (
 -- ===============================
 -- INDEXES
 -- ===============================
-CREATE INDEX IF NOT EXISTS idx_fact_date ON warehouse.fact_sales (date_key);
+-- fact_sales covering indexes (idx_fact_<key>_covering) are derived from
+-- sql/queries/analytical_queries.sql and created by the warehouse load
 
-CREATE INDEX IF NOT EXISTS idx_fact_customer ON warehouse.fact_sales (customer_key);
+CREATE INDEX IF NOT EXISTS idx_fact_transaction ON warehouse.fact_sales (transaction_id);
 
-CREATE INDEX IF NOT EXISTS idx_fact_product ON warehouse.fact_sales (product_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dim_customers_current ON warehouse.dim_customers (customer_id) WHERE is_current;
 
-CREATE INDEX IF NOT EXISTS idx_fact_payment ON warehouse.fact_sales (payment_method_key);
\ No newline at end of file
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dim_products_current ON warehouse.dim_products (product_id) WHERE is_current;
\ No newline at end of file
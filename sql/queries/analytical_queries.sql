@@ -21,6 +21,7 @@ LIMIT 10;
 -- QUERY 2: Monthly Sales Trend
 -- =========================================================
 -- Objective: Analyze revenue trends over time
+-- Params: start_date=1900-01-01, end_date=9999-12-31
 
 SELECT
     CONCAT(d.year, '-', LPAD(d.month::TEXT, 2, '0')) AS year_month,
@@ -30,8 +31,11 @@ SELECT
     COUNT(DISTINCT f.customer_key) AS unique_customers
 FROM warehouse.fact_sales f
 JOIN warehouse.dim_date d ON f.date_key = d.date_key
+-- Filtering on f.date_key lets PostgreSQL skip fact_sales partitions
+WHERE f.date_key BETWEEN TO_CHAR(CAST(:start_date AS DATE), 'YYYYMMDD')::INTEGER
+    AND TO_CHAR(CAST(:end_date AS DATE), 'YYYYMMDD')::INTEGER
 GROUP BY d.year, d.month
-ORDER BY d.year, d.month;
+ORDER BY year_month;
 
 -- =========================================================
 -- QUERY 3: Customer Segmentation Analysis
@@ -150,6 +154,7 @@ GROUP BY
 -- QUERY 8: Product Profitability Analysis
 -- =========================================================
 -- Objective: Identify most profitable products
+-- Params: category=all
 
 SELECT
     p.product_name,
@@ -163,6 +168,9 @@ SELECT
     SUM(f.quantity) AS units_sold
 FROM warehouse.fact_sales f
     JOIN warehouse.dim_products p ON f.product_key = p.product_key
+WHERE
+    :category = 'all'
+    OR p.category = :category
 GROUP BY
     p.product_name,
     p.category
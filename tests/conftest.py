@@ -0,0 +1,49 @@
+import os
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+load_dotenv(PROJECT_ROOT / ".env")
+
+
+@pytest.fixture
+def rolled_back_engine():
+    """
+    Stand-in for an engine whose begin() and connect() share one
+    connection inside a transaction that is rolled back after the test.
+    begin() opens a savepoint, so a failing block is undone on its own
+    like a real transaction. Patch it over a module's engine to let the
+    test write to the shared schemas without leaving anything behind.
+    """
+    engine = create_engine(
+        f"postgresql+psycopg2://{os.getenv('DB_USER')}:"
+        f"{os.getenv('DB_PASSWORD')}@"
+        f"{os.getenv('DB_HOST')}:"
+        f"{os.getenv('DB_PORT')}/"
+        f"{os.getenv('DB_NAME')}"
+    )
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    @contextmanager
+    def begin():
+        with connection.begin_nested():
+            yield connection
+
+    try:
+        yield SimpleNamespace(
+            begin=begin,
+            connect=lambda: nullcontext(connection),
+            dispose=lambda: None
+        )
+    finally:
+        transaction.rollback()
+        connection.close()
+        # Session state such as prepared statements goes with the connection
+        engine.dispose()
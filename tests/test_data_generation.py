@@ -1,3 +1,4 @@
+import io
 import sys
 from pathlib import Path
 import pandas as pd
@@ -11,6 +12,7 @@ sys.path.append(str(PROJECT_ROOT))
 
 # IMPORT MODULE FOR COVERAGE
 import scripts.data_generation.generate_data as gen_module
+import scripts.storage_formats as storage_formats
 
 DATA_DIR = PROJECT_ROOT / "data" / "raw"
 
@@ -62,3 +64,175 @@ def test_line_total_calculation():
         * (1 - items["discount_percentage"] / 100)
     )
     assert np.allclose(items["line_total"], recalculated, atol=0.01)
+
+
+def test_transaction_items_are_reproducible_with_seed():
+    customers = gen_module.generate_customers(20)
+    products = gen_module.generate_products(30)
+    txns_a = gen_module.generate_transactions(200, customers)
+    txns_b = txns_a.copy()
+
+    items_a = gen_module.generate_transaction_items(txns_a, products, seed=7)
+    items_b = gen_module.generate_transaction_items(txns_b, products, seed=7)
+
+    pd.testing.assert_frame_equal(items_a, items_b)
+    assert list(items_a.columns) == [
+        "item_id", "transaction_id", "product_id", "quantity",
+        "unit_price", "discount_percentage", "line_total"
+    ]
+    assert not items_a.duplicated(["transaction_id", "product_id"]).any()
+
+
+def test_transaction_totals_match_items():
+    customers = gen_module.generate_customers(20)
+    products = gen_module.generate_products(30)
+    txns = gen_module.generate_transactions(200, customers)
+    items = gen_module.generate_transaction_items(txns, products, seed=1)
+
+    per_txn = items.groupby("transaction_id")["line_total"].sum()
+    totals = txns.set_index("transaction_id")["total_amount"]
+    assert np.allclose(totals.loc[per_txn.index], per_txn, atol=0.01)
+
+
+def test_streaming_generation_writes_chunked_csvs(tmp_path, monkeypatch):
+    monkeypatch.setattr(gen_module, "DATA_DIR", tmp_path)
+    monkeypatch.setitem(gen_module.config, "data_generation", {
+        **gen_module.config["data_generation"],
+        "customers": 25, "products": 12, "transactions": 70
+    })
+
+    stats = gen_module.generate_all_data_streaming(chunk_size=20)
+
+    transactions = pd.read_csv(tmp_path / "transactions.csv")
+    items = pd.read_csv(tmp_path / "transaction_items.csv")
+    assert stats["transactions"] == len(transactions) == 70
+    assert stats["transaction_items"] == len(items)
+    assert transactions["transaction_id"].is_unique
+    assert items["item_id"].is_unique
+    assert items["transaction_id"].isin(transactions["transaction_id"]).all()
+
+    per_txn = items.groupby("transaction_id")["line_total"].sum()
+    totals = transactions.set_index("transaction_id")["total_amount"]
+    assert np.allclose(totals.loc[per_txn.index], per_txn, atol=0.01)
+
+
+def test_streaming_generation_handles_an_empty_catalogue(tmp_path, monkeypatch):
+    monkeypatch.setattr(gen_module, "DATA_DIR", tmp_path)
+    monkeypatch.setitem(gen_module.config, "data_generation", {
+        **gen_module.config["data_generation"],
+        "customers": 5, "products": 0, "transactions": 0
+    })
+
+    stats = gen_module.generate_all_data_streaming(chunk_size=20)
+
+    assert stats["products"] == 0
+    assert stats["transaction_items"] == 0
+
+
+def test_parallel_generation_matches_single_process(tmp_path, monkeypatch):
+    monkeypatch.setitem(gen_module.config, "data_generation", {
+        **gen_module.config["data_generation"],
+        "customers": 25, "products": 12, "transactions": 70
+    })
+
+    outputs = {}
+    for workers in (1, 3):
+        out_dir = tmp_path / f"workers_{workers}"
+        out_dir.mkdir()
+        monkeypatch.setattr(gen_module, "DATA_DIR", out_dir)
+        gen_module.generate_all_data_streaming(chunk_size=20, workers=workers)
+        outputs[workers] = out_dir
+
+    for name in ["customers.csv", "products.csv", "transactions.csv", "transaction_items.csv"]:
+        assert (outputs[1] / name).read_bytes() == (outputs[3] / name).read_bytes()
+
+
+def test_bounded_shard_map_limits_in_flight_tasks():
+    from concurrent.futures import ThreadPoolExecutor
+
+    submitted = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        original_submit = executor.submit
+
+        def tracking_submit(fn, task):
+            submitted.append(task)
+            return original_submit(fn, task)
+
+        executor.submit = tracking_submit
+        results = gen_module._bounded_map(executor, lambda n: n * n, range(10), window=4)
+
+        assert next(results) == 0
+        # Only the window plus the replacement for the first result
+        assert len(submitted) == 5
+        assert list(results) == [n * n for n in range(1, 10)]
+
+
+def test_pooled_generators_match_per_row_schema():
+    pools = gen_module.build_faker_pools(50, seed=3)
+    assert all(len(values) == len(set(values)) for values in pools.values())
+
+    customers = gen_module.generate_customers(40, pools=pools)
+    products = gen_module.generate_products(40, pools=pools)
+    transactions = gen_module.generate_transactions(40, customers, start=11, pools=pools)
+
+    assert list(customers.columns) == list(gen_module.generate_customers(2).columns)
+    assert list(products.columns) == list(gen_module.generate_products(2).columns)
+    assert list(transactions.columns) == list(
+        gen_module.generate_transactions(2, customers).columns
+    )
+    assert customers["first_name"].isin(pools["first_name"]).all()
+    assert transactions["transaction_id"].iloc[0] == "TXN00011"
+    assert (products["cost"] < products["price"]).all()
+
+
+def test_streaming_generation_writes_parquet_matching_csv(tmp_path, monkeypatch):
+    monkeypatch.setitem(gen_module.config, "data_generation", {
+        **gen_module.config["data_generation"],
+        "customers": 25, "products": 12, "transactions": 70
+    })
+
+    for fmt in ("csv", "parquet"):
+        out_dir = tmp_path / fmt
+        out_dir.mkdir()
+        monkeypatch.setattr(gen_module, "DATA_DIR", out_dir)
+        monkeypatch.setattr(gen_module, "RAW_FORMAT", fmt)
+        gen_module.generate_all_data_streaming(chunk_size=20)
+
+    parquet_path = tmp_path / "parquet" / "transactions.parquet"
+    from_parquet = storage_formats.read_frame(parquet_path, "transactions", "parquet")
+    from_csv = pd.read_csv(tmp_path / "csv" / "transactions.csv")
+    assert len(from_parquet) == len(from_csv) == 70
+    assert list(from_parquet.columns) == list(from_csv.columns)
+
+    csv_text = storage_formats.open_as_csv(parquet_path, "transactions", "parquet").read()
+    rendered = pd.read_csv(io.StringIO(csv_text))
+    pd.testing.assert_frame_equal(rendered, from_csv)
+
+
+def test_columnar_files_stream_to_csv_in_batches(tmp_path):
+    products = gen_module.generate_products(30)
+    expected = None
+    for fmt in ("parquet", "arrow"):
+        path = tmp_path / storage_formats.raw_file_name("products", fmt)
+        with storage_formats.TableWriter(path, "products", fmt) as writer:
+            writer.write(products.iloc[:18])
+            writer.write(products.iloc[18:])
+
+        with storage_formats.open_as_csv(path, "products", fmt, batch_size=7) as stream:
+            header = stream.readline()
+            body = stream.read()
+        rendered = pd.read_csv(io.StringIO(header + body))
+        assert len(rendered) == 30
+
+        chunks = list(storage_formats.read_frames(path, "products", fmt, chunksize=7))
+        assert max(len(chunk) for chunk in chunks) == 7
+        # Categories differ per chunk, so concat falls back to object columns
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True),
+            storage_formats.read_frame(path, "products", fmt),
+            check_dtype=False,
+            check_categorical=False
+        )
+        if expected is None:
+            expected = rendered
+        pd.testing.assert_frame_equal(rendered, expected)
@@ -1,13 +1,23 @@
 import sys
 import os
+import json
 from pathlib import Path
+import pandas as pd
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+import scripts.ingestion.fingerprint_cache as fingerprint_cache
 import scripts.ingestion.ingest_to_staging as ingest_module
+import scripts.pipeline_orchestrator as orchestrator
+import scripts.transformation.staging_to_production as transform_module
+from scripts.ingestion.fingerprint_cache import (
+    fingerprint_files,
+    pipeline_inputs_unchanged
+)
+from scripts.ingestion.schema_registry import raw_column_types, read_csv_chunks
 
 load_dotenv(PROJECT_ROOT / ".env")
 
@@ -47,3 +57,271 @@ def test_staging_tables_exist():
     table_names = [t[0] for t in tables]
     for t in ["customers", "products", "transactions", "transaction_items"]:
         assert t in table_names
+
+
+def test_copy_load_matches_csv_rows():
+    ingest_module.ingest_to_staging()
+
+    raw_dir = PROJECT_ROOT / "data" / "raw"
+    with engine.connect() as conn:
+        for table in ["customers", "products", "transactions", "transaction_items"]:
+            csv_rows = len(pd.read_csv(raw_dir / f"{table}.csv"))
+            db_rows = conn.execute(
+                text(f"SELECT COUNT(*) FROM staging.{table}")
+            ).scalar()
+            assert db_rows == csv_rows
+
+
+def test_parallel_ingestion_records_table_timings(monkeypatch):
+    monkeypatch.setattr(ingest_module, "PARALLEL", True)
+    ingest_module.ingest_to_staging()
+
+    with open(PROJECT_ROOT / "data" / "staging" / "ingestion_summary.json") as f:
+        summary = json.load(f)
+
+    assert summary["parallel"] is True
+    for table in ["customers", "products", "transactions", "transaction_items"]:
+        loaded = summary["tables_loaded"][f"staging.{table}"]
+        assert loaded["status"] == "success"
+        assert loaded["duration_seconds"] >= 0
+
+
+def test_parallel_ingestion_without_two_phase_commit_loads_sequentially(monkeypatch):
+    monkeypatch.setattr(ingest_module, "PARALLEL", True)
+    monkeypatch.setattr(ingest_module, "prepared_transactions_available", lambda *args: False)
+    monkeypatch.setattr(ingest_module, "ingest_parallel", None)
+    ingest_module.ingest_to_staging()
+
+    with open(PROJECT_ROOT / "data" / "staging" / "ingestion_summary.json") as f:
+        assert json.load(f)["parallel"] is False
+
+
+def test_parallel_ingestion_rolls_back_every_table_on_failure(monkeypatch):
+    monkeypatch.setattr(ingest_module, "PARALLEL", True)
+    monkeypatch.setattr(ingest_module, "SKIP_UNCHANGED", False)
+    load_staging_table = ingest_module.load_staging_table
+
+    def failing_load(connection, table, *args):
+        result = load_staging_table(connection, table, *args)
+        if table == "transaction_items":
+            raise ValueError("simulated load failure")
+        return result
+
+    monkeypatch.setattr(ingest_module, "load_staging_table", failing_load)
+
+    def last_loads():
+        with engine.connect() as conn:
+            return [
+                conn.execute(text(f"SELECT MAX(loaded_at) FROM staging.{t}")).scalar()
+                for t in ["customers", "products", "transactions", "transaction_items"]
+            ]
+
+    before = last_loads()
+    try:
+        ingest_module.ingest_to_staging()
+        assert False, "ingestion should have failed"
+    except ValueError:
+        pass
+    assert last_loads() == before
+
+
+def test_parallel_ingestion_finishes_a_failed_second_phase_commit(monkeypatch):
+    from sqlalchemy.engine.base import TwoPhaseTransaction
+
+    monkeypatch.setattr(ingest_module, "PARALLEL", True)
+    monkeypatch.setattr(ingest_module, "SKIP_UNCHANGED", False)
+    commit = TwoPhaseTransaction.commit
+    failed = []
+
+    def commit_once_failing(transaction):
+        if not failed:
+            failed.append(transaction.xid)
+            raise ConnectionError("simulated lost connection")
+        return commit(transaction)
+
+    monkeypatch.setattr(TwoPhaseTransaction, "commit", commit_once_failing)
+    ingest_module.ingest_to_staging()
+    monkeypatch.undo()
+
+    with engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT COUNT(*) FROM pg_prepared_xacts WHERE gid = :xid"
+        ), {"xid": failed[0]}).scalar() == 0
+        counts = {
+            t: conn.execute(text(f"SELECT COUNT(*) FROM staging.{t}")).scalar()
+            for t in ["customers", "products", "transactions", "transaction_items"]
+        }
+    raw_dir = PROJECT_ROOT / "data" / "raw"
+    for table, count in counts.items():
+        assert count == len(pd.read_csv(raw_dir / f"{table}.csv"))
+
+
+def use_raw_copy(tmp_path, monkeypatch):
+    """Point ingestion and the orchestrator at a copy of data/raw with its own fingerprint cache."""
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    for table in ["customers", "products", "transactions", "transaction_items"]:
+        (raw_dir / f"{table}.csv").write_bytes((PROJECT_ROOT / "data" / "raw" / f"{table}.csv").read_bytes())
+
+    monkeypatch.setattr(ingest_module, "RAW_DATA_DIR", raw_dir)
+    monkeypatch.setattr(ingest_module, "SKIP_UNCHANGED", True)
+    monkeypatch.setattr(orchestrator, "RAW_DATA_DIR", raw_dir)
+    monkeypatch.setattr(fingerprint_cache, "CACHE_FILE", tmp_path / "raw_fingerprints.json")
+    return raw_dir
+
+
+def use_rolled_back_engine(tmp_path, monkeypatch, rolled_back_engine):
+    """Run ingestion and the transform inside the fixture's rolled-back transaction."""
+    monkeypatch.setattr(ingest_module, "create_engine", lambda *args, **kwargs: rolled_back_engine)
+    # A two-phase parallel load needs connections of its own
+    monkeypatch.setattr(ingest_module, "PARALLEL", False)
+    monkeypatch.setattr(ingest_module, "STAGING_DATA_DIR", tmp_path)
+    monkeypatch.setattr(transform_module, "engine", rolled_back_engine)
+    monkeypatch.setattr(transform_module, "REPORT_DIR", tmp_path)
+
+
+def test_incremental_ingestion_skips_unchanged_files(tmp_path, monkeypatch, rolled_back_engine):
+    use_rolled_back_engine(tmp_path, monkeypatch, rolled_back_engine)
+    monkeypatch.setattr(ingest_module, "INGESTION_MODE", "incremental")
+    ingest_module.ingest_to_staging()
+    ingest_module.ingest_to_staging()
+
+    with open(tmp_path / "ingestion_summary.json") as f:
+        summary = json.load(f)
+
+    for table in ["customers", "products", "transactions", "transaction_items"]:
+        loaded = summary["tables_loaded"][f"staging.{table}"]
+        assert loaded["skipped"] is True
+        assert loaded["rows_changed"] == 0
+
+
+def test_changed_row_survives_repeated_ingestion(tmp_path, monkeypatch, rolled_back_engine):
+    raw_file = use_raw_copy(tmp_path, monkeypatch) / "customers.csv"
+    use_rolled_back_engine(tmp_path, monkeypatch, rolled_back_engine)
+    monkeypatch.setattr(ingest_module, "INGESTION_MODE", "incremental")
+    monkeypatch.setattr(transform_module, "INCREMENTAL", True)
+    monkeypatch.setattr(transform_module, "MERGE", True)
+
+    def production_city(customer_id):
+        with rolled_back_engine.connect() as conn:
+            return conn.execute(
+                text("SELECT city FROM production.customers WHERE customer_id = :id"),
+                {"id": customer_id}
+            ).scalar()
+
+    # Bring the consumer mark up to date before changing anything
+    ingest_module.ingest_to_staging()
+    transform_module.staging_to_production()
+
+    customers = pd.read_csv(raw_file, dtype=str, keep_default_na=False)
+    customer_id = customers.loc[0, "customer_id"]
+    customers.loc[0, "city"] = "Watermark Test City"
+    customers.to_csv(raw_file, index=False)
+
+    ingest_module.ingest_to_staging()
+    # An unchanged-file run before the transform must not hide the change
+    ingest_module.ingest_to_staging()
+    transform_module.staging_to_production()
+    assert production_city(customer_id) == "Watermark Test City"
+
+
+def test_fingerprint_cache_detects_changed_files(tmp_path):
+    raw_file = tmp_path / "customers.csv"
+    raw_file.write_text("customer_id\nCUST0001\n")
+    cache = {"pipeline": {"files": fingerprint_files([raw_file])}}
+
+    assert pipeline_inputs_unchanged(cache, fingerprint_files([raw_file]))
+
+    raw_file.write_text("customer_id\nCUST0002\n")
+    assert not pipeline_inputs_unchanged(cache, fingerprint_files([raw_file]))
+
+
+def touch(raw_file):
+    """Change the file's bytes but not its rows: CRLF line endings."""
+    raw_file.write_bytes(raw_file.read_bytes().replace(b"\n", b"\r\n"))
+
+
+def skipped_tables():
+    with open(ingest_module.STAGING_DATA_DIR / "ingestion_summary.json") as f:
+        tables_loaded = json.load(f)["tables_loaded"]
+    return {
+        table.split(".")[1]
+        for table, loaded in tables_loaded.items()
+        if loaded.get("skipped")
+    }
+
+
+def test_full_ingestion_reloads_only_changed_or_edited_tables(tmp_path, monkeypatch, rolled_back_engine):
+    raw_dir = use_raw_copy(tmp_path, monkeypatch)
+    use_rolled_back_engine(tmp_path, monkeypatch, rolled_back_engine)
+    all_tables = {"customers", "products", "transactions", "transaction_items"}
+
+    ingest_module.ingest_to_staging()
+    ingest_module.ingest_to_staging()
+    assert skipped_tables() == all_tables
+
+    touch(raw_dir / "customers.csv")
+    ingest_module.ingest_to_staging()
+    assert skipped_tables() == all_tables - {"customers"}
+
+    # Same row count but different content must not be kept
+    with rolled_back_engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE staging.products SET product_name = 'Edited In Staging'
+            WHERE product_id = (SELECT MIN(product_id) FROM staging.products)
+        """))
+    ingest_module.ingest_to_staging()
+    assert skipped_tables() == all_tables - {"products"}
+
+    with rolled_back_engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT COUNT(*) FROM staging.products WHERE product_name = 'Edited In Staging'"
+        )).scalar() == 0
+
+
+def test_orchestrator_skips_downstream_stages_for_unchanged_inputs(tmp_path, monkeypatch, rolled_back_engine):
+    raw_dir = use_raw_copy(tmp_path, monkeypatch)
+    use_rolled_back_engine(tmp_path, monkeypatch, rolled_back_engine)
+    monkeypatch.setattr(orchestrator, "REPORT_DIR", tmp_path)
+    monkeypatch.setattr(orchestrator, "INGESTION_SUMMARY", tmp_path / "ingestion_summary.json")
+    monkeypatch.setattr(orchestrator, "generate_all_data", lambda: None)
+
+    calls = []
+    for name in ["run_quality_checks", "staging_to_production", "load_warehouse", "generate_analytics"]:
+        monkeypatch.setattr(orchestrator, name, lambda name=name: calls.append(name))
+
+    def run():
+        orchestrator.run_pipeline()
+        with open(tmp_path / "pipeline_execution_report.json") as f:
+            return json.load(f)
+
+    assert run()["status"] == "success"
+    assert len(calls) == 4
+
+    # Nothing changed: every downstream stage is skipped
+    report = run()
+    assert len(calls) == 4
+    assert set(report["skip_decisions"]["stages"]) == orchestrator.INPUT_DEPENDENT_STEPS
+    assert report["steps_executed"]["warehouse_load"]["status"] == "skipped"
+
+    # One touched file reloads its table only, and downstream runs again
+    touch(raw_dir / "products.csv")
+    report = run()
+    assert len(calls) == 8
+    assert set(report["skip_decisions"]["tables"]) == {
+        "staging.customers", "staging.transactions", "staging.transaction_items"
+    }
+    assert report["skip_decisions"]["stages"] == {}
+
+
+def test_schema_registry_drives_typed_chunked_reads():
+    raw_file = PROJECT_ROOT / "data" / "raw" / "transactions.csv"
+    header = pd.read_csv(raw_file, nrows=0).columns
+    assert list(raw_column_types("transactions")) == list(header)
+
+    chunks = list(read_csv_chunks(raw_file, "transactions", chunksize=3000))
+    assert all(len(chunk) <= 3000 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == len(pd.read_csv(raw_file))
+    assert chunks[0]["payment_method"].dtype == "category"
+    assert chunks[0]["transaction_id"].dtype == "string"
+    assert pd.api.types.is_datetime64_any_dtype(chunks[0]["transaction_date"])
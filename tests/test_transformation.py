@@ -1,6 +1,8 @@
 import sys
 import os
+import json
 from pathlib import Path
+import pandas as pd
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
@@ -8,6 +10,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
 import scripts.transformation.staging_to_production as transform_module
+from scripts.transformation.text_normalization import CUSTOMER_TEXT_RULES, normalize_text
 
 load_dotenv(PROJECT_ROOT / ".env")
 
@@ -45,3 +48,99 @@ def test_email_lowercase():
                 WHERE email <> LOWER(email)
             """)
         ).scalar() == 0
+
+
+def test_in_database_execution_matches_staging(monkeypatch):
+    monkeypatch.setattr(transform_module, "EXECUTION", "sql")
+    monkeypatch.setattr(transform_module, "INCREMENTAL", False)
+    transform_module.staging_to_production()
+
+    with open(PROJECT_ROOT / "data" / "processed" / "transformation_summary.json") as f:
+        summary = json.load(f)
+    assert summary["execution"] == "sql"
+
+    with engine.connect() as conn:
+        for table, counts in summary["records_processed"].items():
+            staged = conn.execute(text(f"SELECT COUNT(*) FROM staging.{table}")).scalar()
+            loaded = conn.execute(text(f"SELECT COUNT(*) FROM production.{table}")).scalar()
+            assert counts["input"] == staged
+            assert counts["output"] == loaded == staged - counts["filtered"]
+
+        assert conn.execute(text("""
+            SELECT COUNT(*) FROM production.customers
+            WHERE phone ~ '\\D' OR first_name <> INITCAP(first_name)
+        """)).scalar() == 0
+
+
+def test_streaming_execution_accumulates_chunk_counts(monkeypatch):
+    monkeypatch.setattr(transform_module, "EXECUTION", "streaming")
+    monkeypatch.setattr(transform_module, "INCREMENTAL", False)
+    monkeypatch.setattr(transform_module, "BATCH_SIZE", 700)
+
+    with engine.connect() as conn:
+        chunks = list(transform_module.iter_staging_chunks(conn, "products", 700))
+        staged_products = conn.execute(text("SELECT COUNT(*) FROM staging.products")).scalar()
+    assert all(len(chunk) <= 700 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == staged_products
+
+    transform_module.staging_to_production()
+
+    with open(PROJECT_ROOT / "data" / "processed" / "transformation_summary.json") as f:
+        items = json.load(f)["records_processed"]["transaction_items"]
+
+    with engine.connect() as conn:
+        staged = conn.execute(text("SELECT COUNT(*) FROM staging.transaction_items")).scalar()
+        loaded = conn.execute(text("SELECT COUNT(*) FROM production.transaction_items")).scalar()
+    assert items["input"] == staged
+    assert items["output"] == loaded
+    assert items["filtered"] == items["rejected_reasons"]["invalid_quantity"] == staged - loaded
+
+
+def test_merge_mode_rewrites_only_changed_rows(monkeypatch, tmp_path, rolled_back_engine):
+    monkeypatch.setattr(transform_module, "engine", rolled_back_engine)
+    monkeypatch.setattr(transform_module, "REPORT_DIR", tmp_path)
+    monkeypatch.setattr(transform_module, "EXECUTION", "sql")
+    monkeypatch.setattr(transform_module, "MERGE", True)
+    transform_module.staging_to_production()
+
+    with rolled_back_engine.begin() as conn:
+        customer_id = conn.execute(
+            text("SELECT MIN(customer_id) FROM staging.customers")
+        ).scalar()
+        conn.execute(
+            text("UPDATE staging.customers SET city = 'Merge Test City' WHERE customer_id = :id"),
+            {"id": customer_id}
+        )
+
+    transform_module.staging_to_production()
+    with open(tmp_path / "transformation_summary.json") as f:
+        processed = json.load(f)["records_processed"]
+
+    with rolled_back_engine.connect() as conn:
+        assert conn.execute(
+            text("SELECT city FROM production.customers WHERE customer_id = :id"),
+            {"id": customer_id}
+        ).scalar() == "Merge Test City"
+
+    assert processed["customers"]["merge"]["updated"] == 1
+    assert processed["customers"]["merge"]["inserted"] == 0
+    assert processed["customers"]["merge"]["unchanged"] == processed["customers"]["output"] - 1
+    assert processed["products"]["merge"]["updated"] == 0
+
+
+def test_text_normalization_keeps_nulls():
+    df = pd.DataFrame({
+        "first_name": ["  mary ", None],
+        "email": [" A@B.COM", "x@y.com "],
+        "phone": ["+1 (555) 010-2030", None],
+        "registration_date": pd.to_datetime(["2024-01-01", "2024-02-01"]).date
+    })
+
+    df = normalize_text(df, CUSTOMER_TEXT_RULES)
+
+    assert df["first_name"].tolist()[0] == "Mary"
+    assert df["first_name"].isna().tolist() == [False, True]
+    assert df["email"].tolist() == ["a@b.com", "x@y.com"]
+    assert df["phone"].tolist()[0] == "15550102030"
+    assert df["phone"].dtype == "string[pyarrow]"
+    assert df["registration_date"].dtype == object
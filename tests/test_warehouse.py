@@ -1,7 +1,10 @@
 import sys
 import os
+import json
 from pathlib import Path
-from sqlalchemy import create_engine, inspect
+import pandas as pd
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, inspect, text
 from dotenv import load_dotenv
 
 # -------------------------------------------------
@@ -14,7 +17,34 @@ sys.path.append(str(PROJECT_ROOT))
 # IMPORT PIPELINE + WAREHOUSE MODULES (COVERAGE FIX)
 # -------------------------------------------------
 import scripts.pipeline_orchestrator as pipeline
+import scripts.monitoring.index_advisor as advisor_module
+import scripts.monitoring.query_plans as plans_module
 import scripts.transformation.load_warehouse as warehouse_module
+import scripts.transformation.generate_analytics as analytics_module
+import scripts.transformation.result_cache as result_cache
+from scripts.transformation.analytical_queries import (
+    PREPARED_KEY,
+    execute_prepared,
+    load_queries,
+    prepare_query,
+    statement_name
+)
+from scripts.transformation.materialized_views import (
+    read_view_sql,
+    refresh_materialized_views,
+    view_name
+)
+from scripts.transformation.price_bands import price_band
+from scripts.transformation.warehouse_layout import (
+    DEFAULT_PARTITION,
+    derive_fact_indexes,
+    drop_covering_indexes,
+    ensure_covering_indexes,
+    existing_partitions,
+    fact_columns,
+    is_partitioned,
+    partition_name
+)
 
 
 # -------------------------------------------------
@@ -100,3 +130,400 @@ def test_surrogate_keys():
 
     assert "customer_key" in names
     assert "product_key" in names
+
+
+def test_price_band_matches_configured_thresholds():
+    bands = {"thresholds": [50, 200], "labels": ["Budget", "Mid-range", "Premium"]}
+    prices = [0, 49.99, 50, 199.99, 200, 5000]
+
+    result = price_band(prices, bands)
+
+    assert list(result) == ["Budget", "Budget", "Mid-range", "Mid-range", "Premium", "Premium"]
+    assert result.ordered
+    assert list(result.categories) == bands["labels"]
+
+
+def test_incremental_fact_load_appends_only_new_transactions(monkeypatch, rolled_back_engine):
+    monkeypatch.setattr(warehouse_module, "engine", rolled_back_engine)
+    monkeypatch.setattr(warehouse_module, "FACT_LOAD", "incremental")
+    warehouse_module.load_warehouse()
+
+    with rolled_back_engine.begin() as conn:
+        before = conn.execute(text("SELECT COUNT(*) FROM warehouse.fact_sales")).scalar()
+        assert warehouse_module.load_fact_sales(conn, incremental=True) == 0
+
+        latest = conn.execute(
+            text("SELECT MAX(transaction_id) FROM warehouse.fact_sales")
+        ).scalar()
+        removed = conn.execute(
+            text("DELETE FROM warehouse.fact_sales WHERE transaction_id = :id"),
+            {"id": latest}
+        ).rowcount
+        assert warehouse_module.load_fact_sales(conn, incremental=True) == removed
+
+        after = conn.execute(text("SELECT COUNT(*) FROM warehouse.fact_sales")).scalar()
+    assert after == before
+
+
+def test_scd2_versions_only_changed_customers(rolled_back_engine):
+    with rolled_back_engine.begin() as conn:
+        warehouse_module.load_dim_customers(conn)
+        assert warehouse_module.apply_scd2(
+            conn, "dim_customers", "customer_id", "production.customers",
+            {"email": "email", "city": "city"}
+        ) == (0, 0)
+
+        customer_id = conn.execute(
+            text("SELECT MIN(customer_id) FROM production.customers")
+        ).scalar()
+        conn.execute(
+            text("UPDATE production.customers SET city = 'SCD Test City' WHERE customer_id = :id"),
+            {"id": customer_id}
+        )
+        assert warehouse_module.apply_scd2(
+            conn, "dim_customers", "customer_id", "production.customers",
+            {"email": "email", "city": "city"}
+        ) == (1, 1)
+        assert conn.execute(
+            text("""
+                SELECT city FROM warehouse.dim_customers
+                WHERE customer_id = :id AND is_current
+            """),
+            {"id": customer_id}
+        ).scalar() == "SCD Test City"
+
+
+def test_scd2_expires_products_deleted_upstream(rolled_back_engine):
+    attributes = {"product_name": "product_name", "category": "category"}
+    with rolled_back_engine.begin() as conn:
+        warehouse_module.load_dim_products(conn)
+        # A product no transaction references, so it can be deleted
+        conn.execute(text("""
+            INSERT INTO production.products
+                (product_id, product_name, category, price, cost, stock_quantity)
+            VALUES ('PRODSCD2', 'SCD Test Product', 'Test', 10, 5, 1)
+        """))
+        assert warehouse_module.apply_scd2(
+            conn, "dim_products", "product_id", "production.products", attributes
+        ) == (0, 1)
+
+        conn.execute(text("DELETE FROM production.products WHERE product_id = 'PRODSCD2'"))
+        assert warehouse_module.apply_scd2(
+            conn, "dim_products", "product_id", "production.products", attributes
+        ) == (1, 0)
+        versions = conn.execute(text("""
+            SELECT is_current, end_date FROM warehouse.dim_products
+            WHERE product_id = 'PRODSCD2'
+        """)).all()
+
+    assert len(versions) == 1
+    assert versions[0].is_current is False
+    assert versions[0].end_date is not None
+
+
+def test_incremental_aggregates_match_full_recompute(rolled_back_engine):
+    def snapshot(conn):
+        return {
+            table: conn.execute(text(f"SELECT * FROM warehouse.{table} ORDER BY 1")).all()
+            for table in warehouse_module.AGGREGATES
+        }
+
+    with rolled_back_engine.begin() as conn:
+        warehouse_module.build_aggregates(conn)
+        full = snapshot(conn)
+        assert all(full.values())
+
+        latest = conn.execute(
+            text("SELECT MAX(transaction_id) FROM warehouse.fact_sales")
+        ).scalar()
+        conn.execute(
+            text("DELETE FROM warehouse.fact_sales WHERE transaction_id = :id"),
+            {"id": latest}
+        )
+        last_sales_key = conn.execute(
+            text("SELECT COALESCE(MAX(sales_key), 0) FROM warehouse.fact_sales")
+        ).scalar()
+        warehouse_module.load_fact_sales(conn, incremental=True)
+
+        written = warehouse_module.build_aggregates(conn, since_sales_key=last_sales_key)
+        assert written["agg_daily_sales"] == 1
+        assert snapshot(conn) == full
+
+
+def test_materialized_views_match_their_queries():
+    queries = load_queries()
+    assert [q["number"] for q in queries] == list(range(1, 11))
+
+    with engine.begin() as conn:
+        status = refresh_materialized_views(conn, queries)
+        assert set(status.values()) <= {"dropped", "created", "rebuilt", "refreshed"}
+
+        for query in queries:
+            direct = execute_prepared(conn, query).all()
+            materialized = conn.execute(text(read_view_sql(query))).all()
+            # Queries without ORDER BY may return rows in any order
+            assert sorted(map(str, (row[1:] for row in materialized))) == \
+                sorted(map(str, (tuple(row) for row in direct)))
+
+
+def test_materialized_views_keep_their_query_order():
+    queries = load_queries()
+    with engine.begin() as conn:
+        refresh_materialized_views(conn, queries)
+
+        for query in queries:
+            keys = [item.split()[0] for item in query["order_by"]]
+            if not keys:
+                continue
+            direct = execute_prepared(conn, query).mappings().all()
+            materialized = conn.execute(text(read_view_sql(query))).mappings().all()
+            # Ties may come back in either order, so compare the sort keys
+            assert [[row[k] for k in keys] for row in materialized] == \
+                [[row[k] for k in keys] for row in direct]
+
+
+def test_renamed_query_replaces_its_materialized_view():
+    queries = load_queries()
+    renamed = [dict(q, slug=q["slug"] + "_renamed") if q["number"] == 1 else q for q in queries]
+    old_name, new_name = view_name(queries[0]), view_name(renamed[0])
+
+    with engine.begin() as conn:
+        refresh_materialized_views(conn, queries)
+        # Both views exist side by side until the registry drops the old one
+        status = refresh_materialized_views(conn, renamed)
+        assert status[new_name] == "created"
+
+        status = refresh_materialized_views(conn, queries)
+        assert status[new_name] == "dropped"
+        assert status[old_name] == "refreshed"
+        assert conn.execute(
+            text("SELECT to_regclass(:name) IS NULL"), {"name": f"warehouse.{new_name}"}
+        ).scalar()
+
+
+def test_parallel_analytics_records_wall_times(monkeypatch, tmp_path):
+    monkeypatch.setattr(analytics_module, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(analytics_module, "MAX_WORKERS", 3)
+    monkeypatch.setattr(analytics_module, "RESULT_CACHE", False)
+    analytics_module.generate_analytics()
+
+    with open(tmp_path / "analytics_summary.json") as f:
+        summary = json.load(f)
+
+    assert summary["queries_executed"] == 10
+    assert list(summary["query_results"]) == [f"query{n}" for n in range(1, 11)]
+    for name, result in summary["query_results"].items():
+        assert (tmp_path / f"{name}.csv").exists()
+        assert result["wall_time_ms"] >= result["execution_time_ms"]
+    assert summary["total_execution_time_seconds"] > 0
+
+
+def test_streaming_export_matches_dataframe_export(monkeypatch, tmp_path):
+    query = next(q for q in load_queries() if q["number"] == 1)
+    monkeypatch.setattr(analytics_module, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(analytics_module, "STREAM_BATCH_SIZE", 3)
+
+    monkeypatch.setattr(analytics_module, "STREAMING_EXPORT", False)
+    name, expected = analytics_module.run_query(query)
+    frame_bytes = (tmp_path / f"{name}.csv").read_bytes()
+    frame_csv = pd.read_csv(tmp_path / f"{name}.csv")
+
+    # Streaming the csv format writes the very same bytes
+    monkeypatch.setattr(analytics_module, "STREAMING_EXPORT", True)
+    _, streamed = analytics_module.run_query(query)
+    assert (tmp_path / f"{name}.csv").read_bytes() == frame_bytes
+    assert (streamed["rows"], streamed["columns"]) == (expected["rows"], expected["columns"])
+
+    # pg_csv holds the same values in PostgreSQL's own rendering
+    monkeypatch.setattr(analytics_module, "EXPORT_FORMAT", "pg_csv")
+    _, copied = analytics_module.run_query(query)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / f"{name}.csv"), frame_csv)
+    assert copied["rows"] == expected["rows"]
+
+    monkeypatch.setattr(analytics_module, "EXPORT_FORMAT", "parquet")
+    _, streamed = analytics_module.run_query(query)
+    parquet = pq.ParquetFile(tmp_path / f"{name}.parquet")
+    assert parquet.metadata.num_row_groups > 1
+    assert streamed["rows"] == parquet.metadata.num_rows == len(frame_csv)
+    assert list(parquet.schema_arrow.names) == list(frame_csv.columns)
+
+
+def test_unchanged_warehouse_serves_analytics_from_cache(monkeypatch, tmp_path, rolled_back_engine):
+    monkeypatch.setattr(analytics_module, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(analytics_module, "RESULT_CACHE", True)
+    monkeypatch.setattr(result_cache, "CACHE_DIR", tmp_path / "cache")
+
+    def run():
+        analytics_module.generate_analytics()
+        with open(tmp_path / "analytics_summary.json") as f:
+            return json.load(f)
+
+    first = run()
+    executed = (tmp_path / "query1.csv").read_text()
+    second = run()
+
+    assert (first["cache"]["hits"], first["cache"]["misses"]) == (0, 10)
+    assert (second["cache"]["hits"], second["cache"]["misses"]) == (10, 0)
+    assert (tmp_path / "query1.csv").read_text() == executed
+    assert second["query_results"]["query1"]["rows"] == first["query_results"]["query1"]["rows"]
+
+    # The other export path writes different bytes, so it has its own entries
+    monkeypatch.setattr(analytics_module, "STREAMING_EXPORT", True)
+    streamed = run()
+    assert (streamed["cache"]["hits"], streamed["cache"]["misses"]) == (0, 10)
+
+    with rolled_back_engine.connect() as conn:
+        version = result_cache.warehouse_version(conn)
+
+        # A full fact reload re-keys identical rows without moving the version
+        conn.execute(text("DELETE FROM warehouse.fact_sales"))
+        warehouse_module.load_fact_sales(conn)
+        assert result_cache.warehouse_version(conn) == version
+
+        # Any changed warehouse row moves it, invalidating the cache
+        conn.execute(text(
+            "INSERT INTO warehouse.dim_payment_method (payment_method_name) VALUES ('Cache Test')"
+        ))
+        assert result_cache.warehouse_version(conn) != version
+
+
+def test_parameterized_queries_are_prepared_once_per_connection(rolled_back_engine):
+    queries = {q["slug"]: q for q in load_queries()}
+    monthly = queries["monthly_sales_trend"]
+    assert monthly["params"] == {"start_date": "1900-01-01", "end_date": "9999-12-31"}
+    # Query 3 is a CTE, which the old SELECT-prefix split dropped
+    assert queries["customer_segmentation_analysis"]["sql"].startswith("WITH")
+
+    with rolled_back_engine.connect() as conn:
+        all_months = execute_prepared(conn, monthly).all()
+        prepared = set(conn.info[PREPARED_KEY])
+        june = execute_prepared(
+            conn, monthly, {"start_date": "2024-06-01", "end_date": "2024-06-30"}
+        ).all()
+        assert statement_name(monthly) in prepared
+        assert conn.info[PREPARED_KEY] == prepared
+        assert conn.execute(text(
+            "SELECT COUNT(*) FROM pg_prepared_statements WHERE name = :name"
+        ), {"name": statement_name(monthly)}).scalar() == 1
+
+        assert [row.year_month for row in june] == ["2024-06"]
+        assert june[0] in all_months
+
+        profitability = queries["product_profitability_analysis"]
+        every_product = execute_prepared(conn, profitability).all()
+        electronics = execute_prepared(conn, profitability, {"category": "Electronics"}).all()
+        assert 0 < len(electronics) < len(every_product)
+        assert {row.category for row in electronics} == {"Electronics"}
+
+
+def test_query_plans_flag_changes_against_baseline(monkeypatch, tmp_path):
+    monkeypatch.setattr(plans_module, "REPORT_DIR", tmp_path)
+    monkeypatch.setattr(plans_module, "BASELINE_FILE", tmp_path / "baseline.json")
+    monkeypatch.setattr(plans_module, "PLAN_REPORT", tmp_path / "report.json")
+    monkeypatch.setattr(plans_module, "RUNS", 1)
+    monkeypatch.setattr(plans_module, "MIN_REGRESSION_MS", 0)
+
+    first = plans_module.capture_query_plans()
+    assert len(first["queries"]) == 10
+    assert {q["status"] for q in first["queries"].values()} == {"baseline_created"}
+    assert first["regressions"] == []
+
+    top_products = first["queries"]["query1"]
+    assert top_products["rows"] == 10
+    assert "fact_sales" in top_products["plan_shape"]
+    assert top_products["shared_hit_blocks"] + top_products["shared_read_blocks"] > 0
+
+    # Doctor the baseline: a different plan for query1, a far faster query2
+    baseline = json.loads((tmp_path / "baseline.json").read_text())
+    baseline["top_10_products_by_revenue"]["plan_hash"] = "0" * 12
+    monthly_key = next(k for k in baseline if k.startswith("monthly_sales_trend("))
+    baseline[monthly_key]["execution_time_ms"] = 0.001
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+
+    second = plans_module.capture_query_plans()
+    flagged = {r["query"]: r["flags"] for r in second["regressions"]}
+    assert "plan_changed" in flagged["query1"]
+    assert "latency_regressed" in flagged["query2"]
+    assert "rows_change_pct" in second["queries"]["query3"]
+
+
+def test_plan_hash_ignores_new_partitions():
+    def explain(partitions):
+        scans = [{"Node Type": "Seq Scan", "Relation Name": name} for name in partitions]
+        return {
+            "Plan": {
+                "Node Type": "Aggregate", "Total Cost": 1.0, "Actual Rows": 1,
+                "Plans": [{"Node Type": "Append", "Plans": scans}]
+            },
+            "Execution Time": 1.0,
+            "Planning Time": 0.1
+        }
+
+    with engine.connect() as conn:
+        parents = plans_module.partition_parents(conn)
+    assert parents[partition_name(2024, 6)] == "fact_sales"
+
+    # A new month of data adds an identical Append child
+    months = [partition_name(2024, m) for m in range(1, 13)]
+    grown = {**parents, partition_name(2025, 1): "fact_sales"}
+    before = plans_module.plan_metrics(explain(months), parents)
+    after = plans_module.plan_metrics(explain(months + [partition_name(2025, 1)]), grown)
+
+    assert before["plan_hash"] == after["plan_hash"]
+    assert before["plan_shape"] == "Aggregate(Append(Seq Scan[fact_sales]))"
+    assert before["seq_scans"] == ["fact_sales"]
+
+
+def test_fact_sales_is_partitioned_by_month(rolled_back_engine):
+    with rolled_back_engine.connect() as conn:
+        assert is_partitioned(conn)
+        months = conn.execute(text(
+            "SELECT DISTINCT year, month FROM warehouse.dim_date"
+        )).all()
+        partitions = existing_partitions(conn)
+        assert {partition_name(y, m) for y, m in months} | {DEFAULT_PARTITION} == partitions
+
+        # Every fact lands in its month, none in the catch-all partition
+        assert conn.execute(text(
+            f"SELECT COUNT(*) FROM warehouse.{DEFAULT_PARTITION}"
+        )).scalar() == 0
+        misplaced = conn.execute(text("""
+            SELECT COUNT(*) FROM warehouse.fact_sales
+            WHERE tableoid::regclass::text <> 'warehouse.fact_sales_'
+                || (date_key / 10000) || '_' || LPAD(((date_key / 100) % 100)::TEXT, 2, '0')
+        """)).scalar()
+        assert misplaced == 0
+
+        # A one-month range only scans that month's partition
+        monthly = next(q for q in load_queries() if q["slug"] == "monthly_sales_trend")
+        name = prepare_query(conn, monthly)
+        plan = conn.execute(text(
+            f"EXPLAIN (FORMAT JSON) EXECUTE {name}('2024-06-01', '2024-06-30')"
+        )).scalar()[0]["Plan"]
+        scanned = {
+            node["Relation Name"] for node in plans_module.iter_nodes(plan)
+            if node.get("Relation Name", "").startswith("fact_sales")
+        }
+        assert scanned == {"fact_sales_2024_06"}
+
+
+def test_index_advisor_reports_registry_indexes_and_redundancy(rolled_back_engine):
+    with rolled_back_engine.connect() as conn:
+        derived = derive_fact_indexes(load_queries(), fact_columns(conn))
+        assert derived["idx_fact_product_covering"]["queries"] == ["query1", "query4", "query8"]
+        assert "profit" in derived["idx_fact_product_covering"]["include"]
+
+        indexes = advisor_module.list_indexes(conn)
+        assert advisor_module.missing_indexes(indexes, derived) == []
+
+        # A plain product_key index adds nothing over the covering one
+        conn.execute(text("CREATE INDEX idx_fact_product_plain ON warehouse.fact_sales (product_key)"))
+        indexes = advisor_module.list_indexes(conn)
+        redundant = {r["index"]: r["covered_by"] for r in advisor_module.redundant_indexes(indexes)}
+        assert redundant["idx_fact_product_plain"] == "idx_fact_product_covering"
+        assert "idx_fact_product_plain" in {u["index"] for u in advisor_module.unused_indexes(indexes)}
+
+        # Full reloads drop the covering indexes and build them again after
+        assert sorted(drop_covering_indexes(conn)) == sorted(derived)
+        assert len(advisor_module.missing_indexes(advisor_module.list_indexes(conn), derived)) == len(derived)
+        assert sorted(ensure_covering_indexes(conn)) == sorted(derived)